@@ -11,7 +11,7 @@ st.set_page_config(
 import yaml
 import os
 import sys
-import streamlit_authenticator as stauth
+import extra_streamlit_components as stx
 from PIL import Image
 import subprocess
 import bcrypt
@@ -144,7 +144,7 @@ st.markdown("""
 import yaml
 import os
 import sys
-import streamlit_authenticator as stauth
+import extra_streamlit_components as stx
 from PIL import Image
 import subprocess
 import bcrypt
@@ -152,11 +152,23 @@ from yaml.loader import SafeLoader
 import random
 import importlib.util
 import datetime
+from dotenv import load_dotenv
 
 # Setup paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
+# Settings such as SESSION_SECRET and AUTH_WORKERS come from the project .env
+load_dotenv(os.path.join(BASE_DIR, ".env"))
+
+from engine import METRICS, NO_TIMER, PROFILER, dump_from_env, respond
+from resource_cache import file_version
+from conversation_store import ConversationStore, retention_days_from_env, store_path_from_env, user_session_id, window_size_from_env
+from user_store import open_user_store
+from password_hasher import AuthBusy, AuthTimeout, hasher_from_env
+from session_tokens import SessionTokens, load_secret
+from chat_view import history_html, visible_messages
+
 # Make sure the config directory exists
 os.makedirs(os.path.join(BASE_DIR, "HeroPage", "config"), exist_ok=True)
 CONFIG_PATH = os.path.join(BASE_DIR, "HeroPage", "config", "config.yaml")
@@ -175,7 +187,6 @@ if not os.path.exists(CONFIG_PATH):
         },
         'cookie': {
             'expiry_days': 30,
-            'key': 'sunshine_auth',
             'name': 'sunshine_auth_cookie'
         }
     }
@@ -183,17 +194,63 @@ if not os.path.exists(CONFIG_PATH):
     with open(CONFIG_PATH, 'w') as file:
         yaml.dump(default_config, file)
 
-# Load configuration
-with open(CONFIG_PATH, 'r') as file:
-    config = yaml.load(file, Loader=SafeLoader)
+# Load configuration once per process; saving the file changes its version,
+# so the next rerun in any session picks up the new accounts
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_config(version):
+    with open(CONFIG_PATH, 'r') as file:
+        return yaml.load(file, Loader=SafeLoader)
 
-# Create the authenticator
-authenticator = stauth.Authenticate(
-    config['credentials'],
-    config['cookie']['name'],
-    config['cookie']['key'],
-    config['cookie']['expiry_days']
-)
+config_version = file_version(CONFIG_PATH)
+config = load_config(config_version)
+
+# Returning users are signed in from a session cookie holding a token signed
+# with the server secret (SESSION_SECRET or config/session_secret.txt), which
+# is checked without bcrypt
+@st.cache_resource(show_spinner=False)
+def get_session_tokens(expiry_days):
+    tokens = SessionTokens(load_secret(), expiry_days)
+    tokens.prune()
+    return tokens
+
+SESSION_COOKIE = config['cookie']['name']
+session_tokens = get_session_tokens(config['cookie']['expiry_days'])
+cookie_manager = stx.CookieManager(key="session_cookies")
+
+# Accounts live in the user store (SQLite by default, see USER_STORE); the
+# YAML credentials are imported into it the first time it is opened
+@st.cache_resource(show_spinner=False)
+def get_user_store():
+    return open_user_store(yaml_path=CONFIG_PATH)
+
+user_store = get_user_store()
+
+# bcrypt runs on a small shared worker pool (see AUTH_WORKERS, BCRYPT_ROUNDS);
+# its call counts and latencies are written to metrics/hero.prom
+@st.cache_resource(show_spinner=False)
+def get_password_hasher():
+    hasher = hasher_from_env()
+    METRICS.add_collector(hasher.metric_lines)
+    return hasher
+
+password_hasher = get_password_hasher()
+
+def sign_in(username, user):
+    st.session_state.username = username
+    st.session_state.name = user['name']
+    st.session_state.authentication_status = True
+    st.session_state.page = "home"
+
+def logout():
+    # Revoke the session token so the cookie cannot sign anyone in again
+    token = st.session_state.pop('session_token', None) or cookie_manager.get(SESSION_COOKIE)
+    if token:
+        session_tokens.revoke(token)
+    if cookie_manager.get(SESSION_COOKIE):
+        cookie_manager.delete(SESSION_COOKIE, key="delete_session_cookie")
+    st.session_state.page = "login"
+    st.session_state.authentication_status = False
+    st.rerun()
 
 def create_account():
     with st.form("signup_form", clear_on_submit=True):
@@ -237,26 +294,24 @@ def create_account():
                 error_occurred = True
                 
             # Check if username already exists
-            if new_username in config['credentials']['usernames']:
+            if user_store.get(new_username) is not None:
                 st.error("Username already exists")
                 error_occurred = True
             
             # Only proceed if no errors
             if not error_occurred:
-                # Add new user
-                config['credentials']['usernames'][new_username] = {
-                    'email': new_email,
-                    'name': new_name,
-                    'password': bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
-                }
-                
-                # Save updated config
-                with open(CONFIG_PATH, 'w') as file:
-                    yaml.dump(config, file)
-                    
-                st.success("Account created successfully! ✅")
-                st.session_state.page = "login"
-                st.rerun()
+                # Add new user; the insert fails if the name was taken meanwhile
+                try:
+                    password_hash = password_hasher.hash(new_password)
+                except AuthBusy:
+                    st.warning("Lots of people are signing up right now. Please try again in a moment.")
+                else:
+                    if user_store.add(new_username, new_name, new_email, password_hash):
+                        st.success("Account created successfully! ✅")
+                        st.session_state.page = "login"
+                        st.rerun()
+                    else:
+                        st.error("Username already exists")
 
 def home_page():
     # Apply custom CSS for Gen Z styling to the entire app
@@ -450,153 +505,64 @@ def doctor_page():
     </div>
     """, unsafe_allow_html=True)
 
-def get_response(user_input):
-    # Convert input to lowercase for easier matching
-    input_lower = user_input.lower()
-    
-    # Mental health focused responses with positive reinforcement
-    responses = {
-        # Job stress and loss
-        "stressed about job": "I hear how overwhelming work stress can be. Remember, your well-being comes first. Here are some ways to cope: 🌟\n1. Take regular breaks\n2. Practice deep breathing\n3. Set clear boundaries\n4. Talk to someone you trust\n5. Focus on what you can control\nWould you like to talk more about what's stressing you? 💛",
-        "job stress": "Work stress can feel overwhelming, but remember - you've handled challenges before. Here's what might help: 🌟\n1. Break tasks into smaller steps\n2. Practice self-care\n3. Set realistic goals\n4. Take time to recharge\n5. Remember your worth isn't defined by work\nLet's talk about what's going on. 💫",
-        "fired from job": "I'm sorry to hear about your job loss. This can be really tough, but remember - this is just one chapter in your story. Here are some steps forward: 🌟\n1. Allow yourself to feel your emotions\n2. Update your resume\n3. Reach out to your network\n4. Take time to reflect\n5. Remember your skills and strengths\nWould you like to talk about your next steps? 💪",
-        "lost my job": "I hear how difficult this time is for you. Remember, your worth isn't defined by your job. Here's how to move forward: 🌟\n1. Process your feelings\n2. Update your skills\n3. Network with others\n4. Take care of yourself\n5. Stay positive and persistent\nYou've got this! 💛",
-        
-        # Loss of loved ones
-        "death of loved one": "I'm so sorry for your loss. Grieving is a personal journey, and it's okay to feel however you feel. Here are some ways to cope: 🌟\n1. Allow yourself to grieve\n2. Talk about your loved one\n3. Take care of yourself\n4. Seek support from others\n5. Remember the good times\nWould you like to share memories of your loved one? 💛",
-        "lost someone": "I hear how painful this loss is for you. Grief takes time, and it's okay to feel whatever you're feeling. Here's what might help: 🌟\n1. Express your feelings\n2. Create a memory book\n3. Talk to supportive people\n4. Take things one day at a time\n5. Be gentle with yourself\nWould you like to talk about your loved one? 💫",
-        "someone died": "I'm deeply sorry for your loss. Grieving is a natural process, and there's no right way to do it. Here are some ways to cope: 🌟\n1. Share your feelings\n2. Create rituals to remember\n3. Seek support from others\n4. Take care of your health\n5. Be patient with yourself\nWould you like to talk about how you're feeling? 💛",
-        
-        # School bullying
-        "school bully": "I'm so sorry you're experiencing bullying at school. Remember, you don't deserve this treatment. Here are some steps you can take: 🌟\n1. Talk to a trusted teacher or counselor\n2. Document the incidents\n3. Stay close to supportive friends\n4. Practice self-care\n5. Remember your worth isn't defined by their actions\nWould you like to talk more about what's happening? 💛",
-        "being bullied at school": "I hear how difficult this is for you. School should be a safe place. Here's what you can do: 🌟\n1. Tell a trusted adult about what's happening\n2. Keep a record of the incidents\n3. Stay with supportive friends\n4. Practice self-care activities\n5. Remember you're not alone in this\nWould you like to discuss how we can handle this situation? 💫",
-        "classmates bullying me": "I'm here to support you through this. Remember, their actions say more about them than about you. Here are some ways to cope: 🌟\n1. Build a support network\n2. Focus on your strengths\n3. Practice self-compassion\n4. Document the incidents\n5. Talk to school authorities\nYou're stronger than their words! 💪",
-        
-        # Workplace bullying
-        "office bully": "I'm sorry you're experiencing bullying at work. This is unacceptable. Here are some steps you can take: 🌟\n1. Document all incidents\n2. Report to HR or management\n3. Stay professional\n4. Build a support network\n5. Know your rights\nWould you like to talk more about the situation? 💛",
-        "workplace bullying": "I hear how challenging this is. Your workplace should be professional and respectful. Here's what you can do: 🌟\n1. Keep detailed records\n2. Report to appropriate channels\n3. Stay focused on your work\n4. Seek support from colleagues\n5. Know your company's policies\nRemember, you deserve respect! 💫",
-        "boss bullying me": "I'm sorry you're experiencing this from someone in authority. This is not okay. Here are some steps: 🌟\n1. Document all interactions\n2. Report to HR or higher management\n3. Stay professional\n4. Know your rights\n5. Consider seeking legal advice\nWould you like to discuss your options? 💪",
-        
-        # Online bullying
-        "cyberbully": "I'm sorry you're experiencing online bullying. This can be especially hurtful. Here's what you can do: 🌟\n1. Don't respond to the bully\n2. Save evidence (screenshots)\n3. Block and report the person\n4. Talk to someone you trust\n5. Take breaks from social media\nRemember, you're not alone in this! 💛",
-        "online bullying": "I hear how difficult this is. The online world should be safe for everyone. Here are some steps: 🌟\n1. Document all messages\n2. Report to platform moderators\n3. Block the person\n4. Take care of your mental health\n5. Talk to someone you trust\nWould you like to discuss how you're feeling? 💫",
-        
-        # General bullying support
-        "i'm being bullied": "I'm so sorry you're going through this. Remember, their words don't define your worth. You are unique, valuable, and deserving of respect. Would you like to talk about what's happening? 💛",
-        "i'm getting bullied": "That's really tough, but remember - you are not alone in this. Your strength is greater than their words. Would you like to discuss how we can handle this situation? 🌟",
-        "people are bullying me": "I'm here to support you. Remember, you are worthy of love and respect. Let's talk about how you're feeling and what we can do. You're stronger than you think! 💪",
-        
-        # Peace and mental health tips
-        "tips for peace": "Here are some ways to find peace: 🌟\n1. Practice deep breathing exercises\n2. Try meditation for 5-10 minutes daily\n3. Spend time in nature\n4. Keep a gratitude journal\n5. Listen to calming music\n6. Practice mindfulness in daily activities\n7. Connect with loved ones\n8. Take regular breaks from screens\n9. Exercise regularly\n10. Get enough sleep\nRemember, peace is a journey, not a destination. Start with small steps! 💫",
-        "how to find peace": "Finding peace starts with small steps: 🌟\n1. Accept your feelings without judgment\n2. Create a peaceful space at home\n3. Practice self-compassion\n4. Set healthy boundaries\n5. Focus on the present moment\n6. Let go of things you can't control\n7. Find activities that bring you joy\n8. Practice forgiveness\n9. Connect with nature\n10. Be kind to yourself\nPeace comes from within - you've got this! 💛",
-        
-        # Crisis situations
-        "i want to die": "I'm really concerned about what you're going through. Your life is valuable and important. Please, let's talk about this. You're not alone, and there are people who care about you deeply. Would you like to talk about what's making you feel this way? 💛",
-        "i wanna die": "I hear how much pain you're in right now. Please know that your life matters, and there are people who want to help you through this. Let's talk about what's going on. You don't have to face this alone. 💛",
-        "i want to kill myself": "I'm very concerned about you. Your life is precious, and there are people who care about you. Please, let's talk about this. You don't have to go through this alone. Would you like to share what's making you feel this way? 💛",
-        "i'm suicidal": "I'm really worried about you. Your life is valuable, and there are people who want to help you through this difficult time. Let's talk about what's going on. You're not alone in this. 💛",
-        
-        # Hopelessness and despair
-        "i don't know what to do": "I hear how lost you're feeling right now. It's okay to feel this way, but remember - you don't have to figure everything out alone. Let's talk through this together. What's been going on? 💛",
-        "i feel hopeless": "I understand you're feeling hopeless right now. Remember, feelings are temporary, even when they feel overwhelming. Let's talk about what's making you feel this way. You're stronger than you think. 🌟",
-        "i can't go on": "I hear how difficult things are for you right now. Please know that you don't have to face this alone. Let's talk about what's going on. There are people who care about you and want to help. 💛",
-        "i give up": "I understand you're feeling overwhelmed right now. It's okay to feel this way, but remember - you don't have to give up. Let's talk about what's making you feel this way. You're stronger than you think. 🌟",
-        
-        # Depression related
-        "i'm depressed": "I hear you, and I want you to know that your feelings are valid. But remember, even in the darkest moments, there's always a way forward. You're stronger than you think! 💪 Would you like to talk about what's been going on? 💛",
-        "i feel depressed": "I'm here for you. Remember, every storm eventually passes, and you have the strength to weather this one. Let's take it one step at a time. What's been on your mind lately? 🌟",
-        "i'm feeling down": "It's okay to feel down sometimes. Just remember, you've overcome challenges before, and you can do it again. Would you like to share what's been bothering you? I'm here to listen. 💫",
-        
-        # Sadness related
-        "i'm sad": "I'm here for you. Remember, it's okay to feel sad, but don't forget that brighter days are ahead. Would you like to talk about what's making you feel this way? 💛",
-        "i feel sad": "Your feelings are valid, and it's okay to feel this way. Just remember, every emotion is temporary, and you have the strength to get through this. Let's talk about what's on your mind. 🌟",
-        "i'm feeling sad": "It's okay to feel this way. Remember, you've overcome sadness before, and you can do it again. Would you like to share what's been bothering you? 💫",
-        
-        # General emotional support
-        "i need help": "I'm here to help you. Remember, asking for help is a sign of strength, not weakness. What's going on? You're not alone in this. 💛",
-        "i feel lost": "I'm here to help you find your way. Remember, even when you feel lost, you're still moving forward. Would you like to talk about what's making you feel this way? 💫",
-        
-        # Greetings and basic responses
-        "hi": "Hey there! 👋 How are you feeling today? Remember, every day is a new opportunity for growth!",
-        "hello": "Hi! I'm here to listen and support you. How can I help you today? 💛",
-        "help": "I'm here to chat about anything that's on your mind - your feelings, struggles, or just to listen. Remember, you're stronger than you think! 💫",
-        "bye": "Take care! Remember, you're capable of amazing things! Stay strong and keep shining! ✌️",
-        "thanks": "You're welcome! Remember, I'm always here to support you. Keep believing in yourself! 💛"
-    }
-    
-    # Check for exact matches first
-    if input_lower in responses:
-        return responses[input_lower]
-    
-    # Check for partial matches with more context
-    for key in responses:
-        if key in input_lower:
-            return responses[key]
-    
-    # Check for emotional keywords with positive reinforcement
-    emotional_keywords = {
-        "job": "I hear you're going through a tough time at work. Remember, your worth isn't defined by your job. Would you like to talk about what's happening? 💛",
-        "work": "Work can be challenging, but remember - you've overcome challenges before. Let's talk about what's going on. 💫",
-        "fired": "I'm sorry to hear about your job loss. This is a difficult time, but remember - this is just one chapter in your story. Would you like to talk about your next steps? 💪",
-        "death": "I'm so sorry for your loss. Grieving is a personal journey, and it's okay to feel however you feel. Would you like to talk about it? 💛",
-        "died": "I hear how painful this loss is for you. Would you like to share memories of your loved one? 💫",
-        "loss": "I'm here to support you through this difficult time. Would you like to talk about how you're feeling? 💛",
-        "bully": "I'm sorry you're experiencing this. Remember, you are worthy of love and respect. Let's talk about what's happening and how we can handle it. 🌟",
-        "bullied": "I hear you're going through a tough time. Remember, you don't deserve this treatment. Would you like to talk about what's happening? 💛",
-        "harassment": "I'm sorry you're experiencing this. This is not okay. Let's talk about what's happening and how we can address it. 💪",
-        "teasing": "I understand how hurtful this can be. Remember, their words don't define your worth. Would you like to talk about it? 💫",
-        "die": "I'm really concerned about what you're going through. Your life is valuable and important. Please, let's talk about this. You're not alone, and there are people who care about you deeply. 💛",
-        "suicide": "I'm very worried about you. Your life matters, and there are people who want to help you through this difficult time. Let's talk about what's going on. You don't have to face this alone. 💛",
-        "kill myself": "I'm deeply concerned about you. Please know that your life is precious, and there are people who care about you. Let's talk about what's making you feel this way. 💛",
-        "end it all": "I hear how much pain you're in right now. Please know that your life matters, and there are people who want to help you through this. Let's talk about what's going on. 💛",
-        "depress": "I hear you're feeling down. Remember, even in the darkest moments, there's always hope. Would you like to talk about what's been going on? 💛",
-        "sad": "It's okay to feel sad. Remember, brighter days are ahead. Would you like to share what's on your mind? 💫",
-        "hopeless": "I understand you're feeling hopeless right now. Remember, feelings are temporary, even when they feel overwhelming. Let's talk about what's making you feel this way. 💛",
-        "worthless": "You are not worthless. You are valuable and important. Let's talk about what's making you feel this way. 💛",
-        "alone": "You are not alone in this. I'm here to listen and support you. Let's talk about what's going on. 💫"
-    }
-    
-    for keyword in emotional_keywords:
-        if keyword in input_lower:
-            return emotional_keywords[keyword]
-    
-    # Default supportive and motivational responses
-    default_responses = [
-        "I'm here to listen. Remember, you're stronger than you think! How are you feeling about this? 💛",
-        "That sounds tough, but I believe in your ability to handle this. Would you like to talk more about it? 🌟",
-        "I hear you. Remember, every challenge is an opportunity for growth. Let's work through this together. 💪",
-        "Your feelings are valid, and you're doing great by reaching out. What's been on your mind? 💫",
-        "I'm here to support you. Remember, you're capable of amazing things! How can I help? 💛",
-        "Let's talk about how you're feeling. Remember, you're not alone in this journey. 🌟",
-        "I'm listening. Remember, every step forward, no matter how small, is progress. What's been going on? 💫",
-        "You're not alone in this. Remember, you have the strength to overcome challenges. Let's talk about it. 💛",
-        "I'm here for you. Remember, you're doing better than you think. What's been bothering you? 🌟",
-        "Let's work through this together. Remember, you're stronger than any challenge you face. 💪"
-    ]
-    
-    return random.choice(default_responses)
+def get_response(user_input, timer=NO_TIMER):
+    return respond(user_input, {"rules": "hero", "timer": timer}).text
+
+# Signed-in users named in PROFILE_USERS (comma separated) get a sidebar
+# switch that profiles their chat turns, or samples the whole server for N
+# seconds; captures still need PROFILE_TOKEN and are rate limited
+PROFILE_USERS = frozenset(name.strip() for name in os.getenv("PROFILE_USERS", "").split(",") if name.strip())
+
+def may_profile():
+    return bool(PROFILER.token) and st.session_state.get('username') in PROFILE_USERS
+
+def profile_controls():
+    if not may_profile():
+        return
+    with st.expander("Profiling"):
+        st.checkbox("Profile my chat turns", key="profile_turns")
+        st.number_input("Sample the whole server for (seconds, 0 traces the turn)", min_value=0,
+                        max_value=int(PROFILER.max_seconds), key="profile_seconds")
+
+def profile_capture():
+    if not may_profile() or not st.session_state.get('profile_turns'):
+        return PROFILER.capture("hero", None)
+    return PROFILER.capture("hero", PROFILER.token, st.session_state.get('profile_seconds'))
+
+# Turn latency metrics are written to metrics/hero.prom (see METRICS_DUMP_INTERVAL)
+@st.cache_resource(show_spinner=False)
+def start_metrics_dump():
+    return dump_from_env("hero")
+
+@st.cache_resource(show_spinner=False)
+def get_conversation_store(path, retention_days):
+    return ConversationStore(path, retention_days)
+
+def chat_message_html(message):
+    role_class = 'user-message' if message['role'] == 'user' else 'bot-message'
+    return f'<div class="chat-message {role_class}">{message["content"]}</div>'
 
 def launch_chatbot():
     st.title("✨ Vibe Check Bot")
     st.markdown("### let's chat about whatever's on your mind! 🌈")
     
-    # Initialize chat history in session state
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    # Chat history is stored on disk per user; the session keeps only the
+    # latest messages, and switches history when another user logs in
+    conversation = st.session_state.get('conversation')
+    session_id = user_session_id(st.session_state.username)
+    if conversation is None or conversation.session_id != session_id:
+        conversation = get_conversation_store(store_path_from_env(), retention_days_from_env()).window(
+            session_id, window_size_from_env())
+        st.session_state.conversation = conversation
     
-    # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(f"""
-                <div class="chat-message {'user-message' if message['role'] == 'user' else 'bot-message'}">
-                    {message["content"]}
-                </div>
-            """, unsafe_allow_html=True)
+    # Display the latest chat messages as one HTML fragment
+    st.markdown(history_html(conversation.session_id, visible_messages(conversation), chat_message_html),
+                unsafe_allow_html=True)
     
     # Chat input
     if prompt := st.chat_input("💭 what's on your mind?"):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        conversation.append("user", prompt)
         
         # Display user message
         with st.chat_message("user"):
@@ -607,10 +573,12 @@ def launch_chatbot():
             """, unsafe_allow_html=True)
         
         # Get bot response
-        response = get_response(prompt)
+        timer = METRICS.timer("hero")
+        with profile_capture():
+            response = get_response(prompt, timer)
         
         # Add bot response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
+        conversation.append("assistant", response)
         
         # Display bot response
         with st.chat_message("assistant"):
@@ -619,14 +587,27 @@ def launch_chatbot():
                     {response}
                 </div>
             """, unsafe_allow_html=True)
+        timer.mark("render")
+        timer.finish()
         
         # Rerun to update the display
         st.rerun()
 
+start_metrics_dump()
+
 # Initialize session state
 if 'page' not in st.session_state:
     st.session_state.page = "login"
 
+# Sign returning users in from their session cookie
+if not st.session_state.get('authentication_status'):
+    session_token = cookie_manager.get(SESSION_COOKIE)
+    cookie_username = session_tokens.verify(session_token)
+    cookie_user = user_store.get(cookie_username) if cookie_username is not None else None
+    if cookie_user is not None:
+        sign_in(cookie_username, cookie_user)
+        st.session_state.session_token = session_token
+
 # Main app logic
 if st.session_state.page == "login":
     st.markdown("""
@@ -678,19 +659,31 @@ if st.session_state.page == "login":
                 if login_button:
                     try:
                         # We'll handle authentication manually since we're using a custom form
-                        if username in config['credentials']['usernames']:
-                            user_hash = config['credentials']['usernames'][username]['password']
-                            if bcrypt.checkpw(password.encode(), user_hash.encode()):
-                                # Set session state
-                                st.session_state.username = username
-                                st.session_state.name = config['credentials']['usernames'][username]['name']
-                                st.session_state.authentication_status = True
-                                st.session_state.page = "home"
+                        user = user_store.get(username)
+                        if user is not None:
+                            password_ok, new_hash = password_hasher.verify(password, user['password'])
+                            if password_ok:
+                                # Store a rehash if the work factor has changed
+                                if new_hash:
+                                    user_store.set_password(username, new_hash)
+                                
+                                # Set session state and remember the login in a cookie
+                                sign_in(username, user)
+                                token = session_tokens.issue(username)
+                                st.session_state.session_token = token
+                                cookie_manager.set(
+                                    SESSION_COOKIE, token, key="set_session_cookie",
+                                    expires_at=datetime.datetime.now() + datetime.timedelta(days=config['cookie']['expiry_days'])
+                                )
                                 st.rerun()
                             else:
                                 st.error("Incorrect password")
                         else:
                             st.error("Username not found")
+                    except AuthTimeout:
+                        st.warning("Signing in is taking longer than usual. Please try again in a moment.")
+                    except AuthBusy:
+                        st.warning("Lots of people are signing in right now. Please try again in a moment.")
                     except Exception as e:
                         st.error(f"An error occurred: {e}")
                         st.info("Try using username: admin, password: admin123")
@@ -751,26 +744,24 @@ if st.session_state.page == "login":
                         error_occurred = True
                         
                     # Check if username already exists
-                    if new_username in config['credentials']['usernames']:
+                    if user_store.get(new_username) is not None:
                         st.error("Username already exists")
                         error_occurred = True
                     
                     # Only proceed if no errors
                     if not error_occurred:
-                        # Add new user
-                        config['credentials']['usernames'][new_username] = {
-                            'email': new_email,
-                            'name': new_name,
-                            'password': bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
-                        }
-                        
-                        # Save updated config
-                        with open(CONFIG_PATH, 'w') as file:
-                            yaml.dump(config, file)
-                            
-                        st.success("Account created successfully! ✅")
-                        st.session_state.page = "login"
-                        st.rerun()
+                        # Add new user; the insert fails if the name was taken meanwhile
+                        try:
+                            password_hash = password_hasher.hash(new_password)
+                        except AuthBusy:
+                            st.warning("Lots of people are signing up right now. Please try again in a moment.")
+                        else:
+                            if user_store.add(new_username, new_name, new_email, password_hash):
+                                st.success("Account created successfully! ✅")
+                                st.session_state.page = "login"
+                                st.rerun()
+                            else:
+                                st.error("Username already exists")
                 
                 st.markdown("""
                 <div style="text-align: center; margin-top: 2.5rem; font-size: 0.95rem; color: var(--text-secondary);">
@@ -794,26 +785,21 @@ elif st.session_state.page == "home":
     # Display logout in sidebar
     with st.sidebar:
         if st.button("Logout"):
-            st.session_state.page = "login"
-            st.session_state.authentication_status = False
-            st.rerun()
+            logout()
     
     home_page()
     
 elif st.session_state.page == "doctor":
     with st.sidebar:
         if st.button("Logout"):
-            st.session_state.page = "login"
-            st.session_state.authentication_status = False
-            st.rerun()
+            logout()
     
     doctor_page()
     
 elif st.session_state.page == "chatbot":
     with st.sidebar:
         if st.button("Logout"):
-            st.session_state.page = "login"
-            st.session_state.authentication_status = False
-            st.rerun()
+            logout()
+        profile_controls()
     
     launch_chatbot() 
\ No newline at end of file
@@ -1,12 +1,9 @@
 import os
 import streamlit as st
-import random
-import re
-import json
-from datetime import datetime
 from dotenv import load_dotenv
-from resources import CRISIS_RESOURCES, COPING_STRATEGIES, SELF_CARE_REMINDERS, WARNING_SIGNS
-from earkick_responses import EARKICK_RESPONSES
+from engine import METRICS, NO_TIMER, annotate, dump_from_env, get_rules
+from conversation_store import ConversationStore, retention_days_from_env, store_path_from_env, window_size_from_env
+from chat_view import anonymous_session_id, history_html, visible_messages
 
 # Page configuration must be the first Streamlit command
 st.set_page_config(
@@ -18,103 +15,28 @@ st.set_page_config(
 # Load API key from .env file (kept for future use)
 load_dotenv()
 
-# Load training data
-def load_training_data():
-    try:
-        with open('trained_chatbot_data.json', 'r', encoding='utf-8') as f:
-            return json.load(f)['training_data']
-    except FileNotFoundError:
-        st.error("Training data not found. Please run train_chatbot.py first.")
-        return []
+# Rule table built from the training data and the Earkick responses. The
+# engine loads it once per process, shares it across sessions and reloads it
+# when any of its files change
+trained_rules = get_rules("trained")
+if not trained_rules.training_index.size:
+    st.error("Training data not found. Please run train_chatbot.py first.")
+if os.getenv("RESPONSE_MODE") == "retrieval" and trained_rules.retriever is None:
+    st.error("Retrieval mode needs numpy and scipy. Using keyword responses.")
 
-# Initialize training data
-training_data = load_training_data()
+# Turn latency metrics are written to metrics/app.prom (see METRICS_DUMP_INTERVAL)
+@st.cache_resource(show_spinner=False)
+def start_metrics_dump():
+    return dump_from_env("app")
 
-# Load responses from earkick_responses.py
-def load_earkick_responses():
-    try:
-        from earkick_responses import EARKICK_RESPONSES
-        return EARKICK_RESPONSES
-    except ImportError:
-        st.error("Could not load specialized responses. Using default responses.")
-        return {}
-
-# Load Earkick responses
-earkick_responses = load_earkick_responses()
-
-# Function to check for crisis keywords
-def check_for_crisis_keywords(text):
-    text = text.lower()
-    crisis_keywords = [
-        "suicide", "kill myself", "end my life", "hurt myself", "harm myself",
-        "don't want to live", "want to die", "better off dead", "no point in living",
-        "i don't want to be here anymore", "i wish i could disappear"
-    ]
-    
-    for keyword in crisis_keywords:
-        if keyword in text:
-            return True, "self_harm"
-    return False, None
-
-# Function to detect issues
-def detect_issue(text):
-    text = text.lower()
-    
-    depression_keywords = ["depress", "sad", "empty", "hopeless"]
-    anxiety_keywords = ["anxi", "worry", "stress", "panic"]
-    
-    if any(keyword in text for keyword in depression_keywords):
-        return "depression"
-    elif any(keyword in text for keyword in anxiety_keywords):
-        return "anxiety"
-    return "general"
+start_metrics_dump()
 
 # Function to find the most appropriate response from training data
-def get_trained_response(user_input, conversation_type=None):
-    user_input = user_input.lower()
-    
-    # First check for crisis keywords
-    is_crisis, crisis_type = check_for_crisis_keywords(user_input)
-    if is_crisis:
-        crisis_responses = [item for item in training_data if item['type'] == 'warning_sign']
-        if crisis_responses:
-            return random.choice(crisis_responses)['response']
-    
-    # Then check conversation type
-    if conversation_type:
-        type_responses = [item for item in training_data if item['type'] == conversation_type]
-        if type_responses:
-            return random.choice(type_responses)['response']
-    
-    # Check for specific issues
-    issue = detect_issue(user_input)
-    if issue != 'general':
-        # First check if we have specialized Earkick responses for this issue
-        if issue in earkick_responses:
-            return random.choice(earkick_responses[issue])
-        
-        # Then check training data
-        issue_responses = [item for item in training_data if item.get('issue') == issue]
-        if issue_responses:
-            return random.choice(issue_responses)['response']
-    
-    # Default to a general response
-    general_responses = [
-        "I hear you. Would you like to tell me more about that?",
-        "That sounds challenging. How are you feeling about it?",
-        "I'm here to listen. What would be most helpful for you right now?",
-        "Thank you for sharing that with me. Would you like to explore this further?",
-        "I understand this is important to you. How can I best support you?",
-        "That's a lot to deal with. What aspect is most difficult for you right now?",
-        "I appreciate you opening up about this. What would help you feel more supported?",
-        "It sounds like you're going through a tough time. What helps you cope when things get difficult?",
-        "I'm here to support you through this. What would be a small step toward feeling better?",
-        "Your feelings make complete sense given what you're experiencing. How can I help?"
-    ]
-    return random.choice(general_responses)
+def get_trained_response(user_input, conversation_type=None, timer=NO_TIMER):
+    return trained_rules.respond(user_input, {"conversation_type": conversation_type, "timer": timer}).text
 
 # Custom CSS
-    st.markdown("""
+st.markdown("""
     <style>
     /* Main theme colors and fonts */
     :root {
@@ -177,7 +99,7 @@ def get_trained_response(user_input, conversation_type=None):
     }
     
     /* Input box */
-    .stTextInput input {
+    [data-testid="stChatInput"] textarea {
         background-color: var(--secondary-color);
         color: white;
         border: none;
@@ -185,7 +107,7 @@ def get_trained_response(user_input, conversation_type=None):
         padding: 12px 20px;
     }
     
-    .stTextInput input::placeholder {
+    [data-testid="stChatInput"] textarea::placeholder {
         color: #a8a8a8;
     }
     
@@ -212,11 +134,16 @@ def get_trained_response(user_input, conversation_type=None):
     footer {visibility: hidden;}
     .stDeployButton {display: none;}
     </style>
-    """, unsafe_allow_html=True)
+""", unsafe_allow_html=True)
+
+# Chat history is stored on disk; the session keeps only its latest messages
+@st.cache_resource(show_spinner=False)
+def get_conversation_store(path, retention_days):
+    return ConversationStore(path, retention_days)
 
-# Initialize session state for chat history if it doesn't exist
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
+if 'conversation' not in st.session_state:
+    st.session_state.conversation = get_conversation_store(store_path_from_env(), retention_days_from_env()).window(
+        anonymous_session_id(), window_size_from_env())
 
 # Display header
 st.markdown('<h1 class="main-header">✨ Vibe Check Bot</h1>', unsafe_allow_html=True)
@@ -231,27 +158,38 @@ st.markdown(
 # Chat container
 st.markdown('<div class="chat-container">', unsafe_allow_html=True)
 
-# Display chat messages
-for message in st.session_state.messages:
+# Display the latest chat messages as one HTML fragment
+def message_html(message):
     if message["role"] == "user":
-        st.markdown(f'<div class="user-message">{message["content"]}</div>', unsafe_allow_html=True)
-            else:
-        st.markdown(f'<div class="bot-message">{message["content"]}</div>', unsafe_allow_html=True)
+        return f'<div class="user-message">{message["content"]}</div>'
+    return f'<div class="bot-message">{message["content"]}</div>'
+
+conversation = st.session_state.conversation
+st.markdown(history_html(conversation.session_id, visible_messages(conversation), message_html),
+            unsafe_allow_html=True)
 
 st.markdown('</div>', unsafe_allow_html=True)
 
-# Chat input
-user_input = st.text_input("", placeholder="what's on your mind?", key="user_input", label_visibility="collapsed")
+# Chat input; it returns a message only on the run it was sent in, so the
+# rerun below does not store it again
+user_input = st.chat_input("what's on your mind?")
 
 if user_input:
-            # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": user_input})
+    # Add user message to chat history
+    st.session_state.conversation.append("user", user_input)
     
-    # Get bot response
-    response = get_trained_response(user_input)
+    # Get bot response. Messages without a specific issue are answered from
+    # the training conversations of their detected type; only those two
+    # stages are run
+    annotation = annotate(user_input, skip={"crisis", "emotions", "name", "emotion_scores"})
+    conversation_type = annotation.conversation_type if annotation.issue == "general" else None
+    timer = METRICS.timer("trained")
+    response = get_trained_response(user_input, conversation_type, timer)
     
     # Add bot response to chat history
-                st.session_state.messages.append({"role": "assistant", "content": response})
+    st.session_state.conversation.append("assistant", response)
+    timer.mark("render")
+    timer.finish()
             
     # Rerun to update the chat display
-    st.experimental_rerun()
\ No newline at end of file
+    st.rerun()
\ No newline at end of file
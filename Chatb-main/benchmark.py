@@ -0,0 +1,282 @@
+"""
+Micro-benchmarks for the response routing hot paths.
+
+    python benchmark.py --output results.json
+    python benchmark.py --sizes 286 10000 1000000 --messages 2000
+    python benchmark.py --sizes --compare results.json
+
+Each front-end's responder is timed message by message over synthetic
+corpora of varying length and keyword density:
+    trained  app.get_trained_response (engine "trained" table)
+    simple   simple_chatbot.get_response (engine "simple" table)
+    hero     HeroPage/main.get_response (engine "hero" table)
+    api      POST /api/chat on the ASGI server, called in process
+    baseline the original HeroPage substring loop, which returns the
+             first keyword found in the message, for comparison
+The trained responder is also run over generated training sets, from the
+real records up to a million examples, loaded from a response bundle the
+same way the app loads them. Results are written as one JSON document so
+runs can be compared across commits; --compare prints the change in median
+latency against an earlier run.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import hero_responses
+import simple_responses
+from engine import get_rules, nlu
+from engine.trained import TRAINING_DATA_PATH, TrainedRules, load_retriever
+from response_bundle import load_bundle, write_bundle
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+API_SERVER_DIR = os.path.join(BASE_DIR, 'modern_chatbot', 'server')
+
+DEFAULT_SIZES = (286, 10000, 100000, 1000000)
+
+# Message lengths in words and the share of words drawn from the keyword tables
+LENGTHS = {"short": 3, "medium": 15, "long": 80}
+DENSITIES = {"none": 0.0, "low": 0.1, "high": 0.5}
+
+FILLER_WORDS = (
+    "today", "really", "just", "think", "about", "maybe", "the", "and", "with",
+    "because", "every", "time", "people", "little", "while", "still", "night",
+    "morning", "thing", "something", "know", "feel", "like", "going", "much",
+    "again", "never", "always", "there", "their", "other", "where", "which"
+)
+
+TRAINING_TYPES = ("greeting", "follow_up", "validation", "coping", "coping_detail",
+                  "self_care", "self_care_implementation", "warning_sign", "crisis")
+TRAINING_ISSUES = (None, "anxiety", "depression", "stress")
+
+
+def keyword_vocabulary():
+    """Every keyword the responders route on"""
+    words = set(hero_responses.RESPONSES) | set(hero_responses.EMOTIONAL_KEYWORDS)
+    for table in (simple_responses.KEYWORDS, nlu.ISSUE_KEYWORDS):
+        for keywords in table.values():
+            words.update(keyword.rstrip("*") for keyword in keywords)
+    words.update(nlu.CRISIS_KEYWORDS)
+    return sorted(words)
+
+
+def make_corpus(count, length, density, rng):
+    """Generate count messages of length words, density of them keywords"""
+    keywords = keyword_vocabulary()
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(keywords) if rng.random() < density else rng.choice(FILLER_WORDS)
+                 for _ in range(length)]
+        messages.append(" ".join(words).capitalize())
+    return messages
+
+
+def make_training_data(size, rng):
+    """Return the real training records, extended with generated ones to size"""
+    with open(TRAINING_DATA_PATH, 'r', encoding='utf-8') as f:
+        records = json.load(f)['training_data'][:size]
+    keywords = keyword_vocabulary()
+    while len(records) < size:
+        issue = rng.choice(TRAINING_ISSUES)
+        record = {
+            "input": " ".join(rng.choice(keywords if rng.random() < 0.3 else FILLER_WORDS)
+                              for _ in range(rng.randint(3, 12))),
+            "response": f"Generated response {len(records)}.",
+            "type": rng.choice(TRAINING_TYPES)
+        }
+        if issue is not None:
+            record["issue"] = issue
+        records.append(record)
+    return records
+
+
+def latency_stats(samples_ns):
+    """Summarise per-message latencies in microseconds"""
+    ordered = sorted(samples_ns)
+    total = sum(ordered)
+
+    def percentile(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] / 1000
+
+    return {
+        "messages": len(ordered),
+        "mean_us": total / len(ordered) / 1000,
+        "p50_us": percentile(0.50),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "max_us": ordered[-1] / 1000,
+        "throughput_per_s": len(ordered) / (total / 1e9) if total else None
+    }
+
+
+def time_calls(call, messages, warmup=100):
+    """Time call(message) once per message, after a short warmup"""
+    for message in messages[:warmup]:
+        call(message)
+    samples = []
+    clock = time.perf_counter_ns
+    for message in messages:
+        start = clock()
+        call(message)
+        samples.append(clock() - start)
+    return latency_stats(samples)
+
+
+def baseline_response(message):
+    """The HeroPage responder before the engine: first keyword that is a substring"""
+    message_lower = message.lower()
+    for table in (hero_responses.RESPONSES, hero_responses.EMOTIONAL_KEYWORDS):
+        for keyword, response in table.items():
+            if keyword in message_lower:
+                return response
+    return random.choice(hero_responses.DEFAULT_RESPONSES)
+
+
+def api_responder():
+    """Return call(message) that posts message to the ASGI server's /api/chat in process"""
+    if API_SERVER_DIR not in sys.path:
+        sys.path.append(API_SERVER_DIR)
+    spec = importlib.util.spec_from_file_location("api_server", os.path.join(API_SERVER_DIR, 'asgi.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    loop = asyncio.new_event_loop()
+    scope = {"type": "http", "method": "POST", "path": "/api/chat", "query_string": b"",
+             "headers": [(b"content-type", b"application/json")]}
+
+    def call(message):
+        request = {"type": "http.request", "body": json.dumps({"message": message}).encode(), "more_body": False}
+        sent = []
+
+        async def receive():
+            return request
+
+        async def send(event):
+            sent.append(event)
+
+        loop.run_until_complete(module.app(scope, receive, send))
+        return json.loads(sent[-1]["body"])["message"]
+
+    return call
+
+
+def responders():
+    """Return {name: call(message)} for each front-end responder"""
+    calls = {}
+    trained = get_rules("trained")
+    calls["trained"] = lambda message: trained.respond(message, {"conversation_type": None}).text
+    for name in ("simple", "hero"):
+        rules = get_rules(name)
+        calls[name] = lambda message, rules=rules: rules.respond(message, {}).text
+    calls["api"] = api_responder()
+    calls["baseline"] = baseline_response
+    return calls
+
+
+def bench_responders(corpora):
+    results = []
+    for name, call in responders().items():
+        for (length, density), messages in corpora.items():
+            stats = time_calls(call, messages)
+            results.append({"benchmark": "respond", "target": name, "length": length,
+                            "density": density, **stats})
+            print(f"{name:8} {length:6} {density:4} p50 {stats['p50_us']:8.1f}us "
+                  f"{stats['throughput_per_s']:10.0f}/s", file=sys.stderr)
+    return results
+
+
+def bench_training_sizes(sizes, corpora, rng):
+    results = []
+    trained = get_rules("trained")
+    messages = corpora[("medium", "low")]
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            bundle_path = os.path.join(directory, f"training_{size}.bin")
+            write_bundle(make_training_data(size, rng), bundle_path)
+            start = time.perf_counter()
+            training_index = load_bundle(bundle_path)
+            load_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            retriever = load_retriever(training_index)
+            index_seconds = time.perf_counter() - start
+            rules = TrainedRules(training_index, trained.earkick_responses, retriever)
+            stats = time_calls(lambda message, rules=rules: rules.respond(message, {}).text, messages)
+            results.append({"benchmark": "training_size", "target": "trained", "size": size,
+                            "retrieval": retriever is not None, "load_s": load_seconds,
+                            "index_s": index_seconds, **stats})
+            print(f"trained  {size:>8} examples p50 {stats['p50_us']:8.1f}us "
+                  f"load {load_seconds * 1000:.1f}ms", file=sys.stderr)
+            del rules, retriever, training_index
+    return results
+
+
+def print_comparison(previous, results):
+    """Print each responder's median latency next to the same case in previous"""
+    earlier = {(result["target"], result["length"], result["density"]): result["p50_us"]
+               for result in previous["results"] if result["benchmark"] == "respond"}
+    print(f"compared with {(previous.get('commit') or 'unknown')[:10]}:", file=sys.stderr)
+    for result in results:
+        key = (result.get("target"), result.get("length"), result.get("density"))
+        if result["benchmark"] != "respond" or key not in earlier:
+            continue
+        print(f"{key[0]:8} {key[1]:6} {key[2]:4} p50 {earlier[key]:8.1f}us -> {result['p50_us']:8.1f}us "
+              f"({earlier[key] / result['p50_us']:.2f}x)", file=sys.stderr)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the response routing hot paths")
+    parser.add_argument("--output", default="-", help="JSON file to write results to, or - for stdout")
+    parser.add_argument("--messages", type=int, default=2000, help="messages per corpus")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES),
+                        help="training set sizes for the trained responder")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated data")
+    parser.add_argument("--compare", help="results file of an earlier run to compare with")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    corpora = {
+        (length, density): make_corpus(args.messages, words, share, rng)
+        for length, words in LENGTHS.items()
+        for density, share in DENSITIES.items()
+    }
+    results = bench_responders(corpora) + bench_training_sizes(args.sizes, corpora, rng)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(json.load(f), results)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "response_mode": os.getenv("RESPONSE_MODE", "keyword"),
+        "seed": args.seed,
+        "results": results
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Windowed chat history for the Streamlit front-ends.
+A rerun draws only the latest CHAT_RENDER_WINDOW messages of a conversation;
+a "Load earlier messages" button adds older pages from the conversation
+store. Front-ends that draw their history as HTML render it as one
+fragment, cached on the ids of the messages it covers. Anonymous sessions
+keep their id in st.session_state, on the server, so no link or browser
+history can open another session's conversation.
+"""
+
+import os
+
+import streamlit as st
+
+import conversation_store
+
+DEFAULT_RENDER_WINDOW = 20
+
+
+def render_window_from_env():
+    """Number of messages drawn per page (CHAT_RENDER_WINDOW)"""
+    return int(os.getenv("CHAT_RENDER_WINDOW", str(DEFAULT_RENDER_WINDOW)))
+
+
+def anonymous_session_id():
+    """Return the conversation id of this browser session, created on first use"""
+    session_id = st.session_state.get("chat_session_id")
+    if session_id is None:
+        session_id = st.session_state.chat_session_id = conversation_store.anonymous_session_id()
+    return session_id
+
+
+def visible_messages(conversation, page_size=None):
+    """Return the messages to draw, with a load-earlier button when there are more"""
+    page_size = page_size or render_window_from_env()
+    key = f"history_pages_{conversation.session_id}"
+    count = page_size * st.session_state.get(key, 1)
+    # One extra message tells whether anything older is left
+    messages = conversation.latest(count + 1)
+    if len(messages) > count:
+        if st.button("⬆️ Load earlier messages", key=f"{key}_button"):
+            st.session_state[key] = st.session_state.get(key, 1) + 1
+            st.rerun()
+        messages = messages[1:]
+    return messages
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _history_html(renderer, session_id, first_id, last_id, _messages, _render):
+    return "\n".join(_render(message) for message in _messages)
+
+
+def history_html(session_id, messages, render):
+    """Join render(message) for every message into one HTML fragment
+
+    Stored messages never change, so the fragment is cached on the session
+    and the first and last message ids.
+    """
+    if not messages:
+        return ""
+    renderer = f"{render.__module__}.{render.__qualname__}"
+    return _history_html(renderer, session_id, messages[0]["id"], messages[-1]["id"], messages, render)
@@ -0,0 +1,179 @@
+"""
+Persistent chat history for the Streamlit front-ends.
+Messages are appended to a SQLite database in WAL mode, so writers never
+rewrite history and readers do not block them. Each session keeps only a
+bounded window of its latest messages in memory; older ones are read back
+a page at a time. Messages older than the retention period are deleted,
+at most once an hour, when a new message is stored. Session ids are
+namespaced, "user:<name>" for signed-in users and "anon:<id>" for anonymous
+sessions, so no username can ever name an anonymous conversation.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, 'conversations.db')
+DEFAULT_WINDOW = 50
+DEFAULT_RETENTION_DAYS = 30
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_by_session ON messages (session_id, id);
+CREATE INDEX IF NOT EXISTS messages_by_created ON messages (created);
+"""
+
+# Databases written before session ids were namespaced hold bare usernames
+# and 32-digit hex anonymous ids; PRAGMA user_version records the upgrade
+SCHEMA_VERSION = 1
+UNPREFIXED = "session_id NOT LIKE 'user:%' AND session_id NOT LIKE 'anon:%'"
+HEX_ID = "[0-9a-f]" * 32
+MIGRATE_SESSION_IDS = f"""
+UPDATE messages SET session_id = 'anon:' || session_id WHERE {UNPREFIXED} AND session_id GLOB '{HEX_ID}';
+UPDATE messages SET session_id = 'user:' || session_id WHERE {UNPREFIXED};
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+
+def user_session_id(username):
+    """Conversation id of a signed-in user"""
+    return f"user:{username}"
+
+
+def anonymous_session_id():
+    """A new conversation id for a session without a user"""
+    return f"anon:{uuid.uuid4().hex}"
+
+
+class ConversationStore:
+    """Append-only message log keyed by session id
+
+    SQLite connections cannot be shared between threads, and Streamlit runs
+    each session on its own thread, so every thread opens its own.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, retention_days=None):
+        self.path = path
+        self.retention = retention_days * 86400 if retention_days else None
+        self._next_prune = 0.0
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                with connection:
+                    connection.executescript(MIGRATE_SESSION_IDS)
+            self._local.connection = connection
+        return connection
+
+    def append(self, session_id, role, content):
+        """Store one message and return it with its id"""
+        now = time.time()
+        if self.retention and now >= self._next_prune:
+            self._next_prune = now + PRUNE_INTERVAL
+            self.prune(now - self.retention)
+        connection = self._connect()
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO messages (session_id, role, content, created) VALUES (?, ?, ?, ?)",
+                (session_id, role, content, now)
+            )
+        return {"id": cursor.lastrowid, "role": role, "content": content}
+
+    def prune(self, before):
+        """Delete messages stored before the given time; returns how many
+
+        The newest message is always kept so SQLite never reuses a message id.
+        """
+        connection = self._connect()
+        with connection:
+            return connection.execute(
+                "DELETE FROM messages WHERE created < ? AND id < (SELECT MAX(id) FROM messages)", (before,)
+            ).rowcount
+
+    def recent(self, session_id, limit=DEFAULT_WINDOW, before_id=None):
+        """Return up to limit messages older than before_id, oldest first"""
+        if before_id is None:
+            before_id = 1 << 62
+        rows = self._connect().execute(
+            "SELECT id, role, content FROM messages WHERE session_id = ? AND id < ? "
+            "ORDER BY id DESC LIMIT ?",
+            (session_id, before_id, limit)
+        ).fetchall()
+        return [{"id": row[0], "role": row[1], "content": row[2]} for row in reversed(rows)]
+
+    def count(self, session_id):
+        """Return how many messages the session has"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
+
+    def window(self, session_id, size=DEFAULT_WINDOW):
+        """Return a ConversationWindow primed with the session's latest messages"""
+        return ConversationWindow(self, session_id, size)
+
+
+class ConversationWindow:
+    """The latest messages of one session, backed by a ConversationStore"""
+
+    def __init__(self, store, session_id, size=DEFAULT_WINDOW):
+        self.store = store
+        self.session_id = session_id
+        self.messages = deque(store.recent(session_id, size), maxlen=size)
+
+    def append(self, role, content):
+        """Store a message and add it to the window, dropping the oldest"""
+        message = self.store.append(self.session_id, role, content)
+        self.messages.append(message)
+        return message
+
+    def latest(self, count):
+        """Return the session's last count messages, oldest first
+
+        Only reads the store when count reaches past a full window; a window
+        that is not full already holds the whole history.
+        """
+        if count <= len(self.messages) or len(self.messages) < self.messages.maxlen:
+            return list(islice(self.messages, max(0, len(self.messages) - count), None))
+        return self.store.recent(self.session_id, count)
+
+    def earlier(self, limit=DEFAULT_WINDOW, before_id=None):
+        """Return the page of messages before before_id, or before the window"""
+        if before_id is None:
+            if not self.messages:
+                return []
+            before_id = self.messages[0]["id"]
+        return self.store.recent(self.session_id, limit, before_id)
+
+
+def window_size_from_env():
+    """Number of messages each session keeps in memory (CHAT_HISTORY_WINDOW)"""
+    return int(os.getenv("CHAT_HISTORY_WINDOW", str(DEFAULT_WINDOW)))
+
+
+def retention_days_from_env():
+    """Days a message is kept (CONVERSATION_RETENTION_DAYS); 0 keeps it forever"""
+    return float(os.getenv("CONVERSATION_RETENTION_DAYS", str(DEFAULT_RETENTION_DAYS)))
+
+
+def store_path_from_env():
+    """Database file for conversations (CONVERSATION_DB)"""
+    return os.getenv("CONVERSATION_DB", DEFAULT_PATH)
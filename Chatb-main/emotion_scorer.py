@@ -0,0 +1,168 @@
+"""
+Emotion intensity scoring over an emotion lexicon.
+emotion_lexicon.json gives each lexicon word a weight for every emotion
+(sadness, anxiety, anger, joy). It is compiled once into a dense word x
+emotion matrix, and a batch of messages is scored with array operations
+over all of its words at once: the words of a batch are mapped to lexicon
+codes with one map() over a dict, and everything after that runs in numpy
+without a Python loop over words. A word right after an intensifier
+("very sad") is scaled by it, and a word with a negator among the
+negation_window words before it ("not sad", "don't feel happy") is scaled by
+negation_factor. Each emotion's sum is clipped at zero and squashed into
+[0, 1) with tanh.
+
+    python emotion_scorer.py messages.jsonl scores.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+from itertools import chain, islice, repeat
+
+import numpy as np
+
+from keyword_matcher import keyword_words
+from resource_cache import cached_on_files
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEXICON_PATH = os.path.join(BASE_DIR, 'emotion_lexicon.json')
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class EmotionScorer:
+    """Dense lexicon matrix with intensifier and negation rules
+
+    words maps each lexicon word to one weight per emotion, in the order of
+    emotions. Messages are split like the keyword matchers split them, so
+    words are lowercase and apostrophes are kept.
+    """
+
+    def __init__(self, emotions, words, intensifiers=None, negators=(),
+                 negation_window=3, negation_factor=-0.5):
+        self.emotions = list(emotions)
+        self.vocabulary = {word: index for index, word in enumerate(words)}
+        weights = [list(row) for row in words.values()]
+        if any(len(row) != len(self.emotions) for row in weights):
+            raise ValueError(f"Every lexicon word needs {len(self.emotions)} emotion weights")
+        # The last row stays zero; every word outside the lexicon maps to it
+        self.matrix = np.zeros((len(weights) + 1, len(self.emotions)))
+        if weights:
+            self.matrix[:-1] = np.asarray(weights, dtype=np.float64)
+        self.intensifiers = dict(intensifiers or {})
+        self.negators = frozenset(negators)
+        self.negation_window = int(negation_window)
+        self.negation_factor = float(negation_factor)
+        self._compile_codes()
+
+    @classmethod
+    def from_file(cls, path=LEXICON_PATH):
+        """Compile a lexicon file"""
+        with open(path, 'r', encoding='utf-8') as file:
+            lexicon = json.load(file)
+        return cls(
+            lexicon["emotions"],
+            lexicon["words"],
+            lexicon.get("intensifiers"),
+            lexicon.get("negators", ()),
+            lexicon.get("negation_window", 3),
+            lexicon.get("negation_factor", -0.5)
+        )
+
+    def _compile_codes(self):
+        # Every lexicon word, intensifier and negator gets a code (0 is any
+        # other word) indexing its lexicon row, intensifier factor and
+        # negator flag, so a batch is looked up with one map() over its words
+        words = list(dict.fromkeys(chain(self.vocabulary, self.intensifiers, self.negators)))
+        self.codes = {word: code for code, word in enumerate(words, 1)}
+        missing = len(self.vocabulary)
+        self.code_rows = np.array([missing] + [self.vocabulary.get(word, missing) for word in words], dtype=np.intp)
+        self.code_factors = np.array([1.0] + [self.intensifiers.get(word, 1.0) for word in words])
+        self.code_negators = np.array([False] + [word in self.negators for word in words])
+
+    def score_tokens(self, token_lists):
+        """Return a messages x emotions intensity array for lists of normalized words"""
+        scores = np.zeros((len(token_lists), len(self.emotions)))
+        lengths = np.fromiter(map(len, token_lists), np.intp, len(token_lists))
+        tokens = list(chain.from_iterable(token_lists))
+        if not tokens:
+            return scores
+        codes = np.fromiter(map(self.codes.get, tokens, repeat(0)), np.intp, len(tokens))
+        rows = self.code_rows[codes]
+        hits = np.flatnonzero(rows < len(self.vocabulary))
+        if not len(hits):
+            return scores
+
+        message_ids = np.repeat(np.arange(len(token_lists)), lengths)
+        # Index of the first word of each hit's message
+        first = (np.cumsum(lengths) - lengths)[message_ids[hits]]
+        scale = np.where(hits > first, self.code_factors[codes[hits - 1]], 1.0)
+        negators = self.code_negators[codes]
+        if self.negation_window > 0 and negators.any():
+            # negators_before[i] is the number of negators before word i
+            negators_before = np.concatenate(([0], np.cumsum(negators)))
+            window_start = np.maximum(hits - self.negation_window, first)
+            negated = negators_before[hits] > negators_before[window_start]
+            scale = np.where(negated, scale * self.negation_factor, scale)
+
+        contributions = self.matrix[rows[hits]] * scale[:, None]
+        for column in range(len(self.emotions)):
+            scores[:, column] = np.bincount(message_ids[hits], weights=contributions[:, column],
+                                            minlength=len(token_lists))
+        return np.tanh(np.clip(scores, 0.0, None))
+
+    def score_batch(self, messages):
+        """Return a messages x emotions intensity array"""
+        return self.score_tokens([keyword_words(message) for message in messages])
+
+    def score(self, message):
+        """Return {emotion: intensity} for one message"""
+        return dict(zip(self.emotions, self.score_batch([message])[0].tolist()))
+
+
+@cached_on_files(LEXICON_PATH)
+def load_emotion_scorer():
+    """Return the scorer for emotion_lexicon.json, recompiled when the file changes"""
+    return EmotionScorer.from_file(LEXICON_PATH)
+
+
+def score_jsonl(input_file, output_file, scorer, field="message", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Add "emotion_scores" to every JSONL record, scoring chunk_size records at a time"""
+    records = (json.loads(line) for line in input_file if line.strip())
+    records = (record if isinstance(record, dict) else {field: record} for record in records)
+    count = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return count
+        scores = scorer.score_batch([str(record.get(field, "")) for record in chunk]).round(4).tolist()
+        for record, row in zip(chunk, scores):
+            record["emotion_scores"] = dict(zip(scorer.emotions, row))
+            output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += len(chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score the emotions of a JSONL file of messages")
+    parser.add_argument("input", help="JSONL file of messages, or - for stdin")
+    parser.add_argument("output", help="JSONL file to write results to, or - for stdout")
+    parser.add_argument("--lexicon", default=LEXICON_PATH, help="emotion lexicon file")
+    parser.add_argument("--field", default="message", help="record field holding the message")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="messages per chunk")
+    args = parser.parse_args(argv)
+
+    scorer = EmotionScorer.from_file(args.lexicon)
+    input_file = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    output_file = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    try:
+        count = score_jsonl(input_file, output_file, scorer, args.field, args.chunk_size)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f"Scored {count} messages", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
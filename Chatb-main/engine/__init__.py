@@ -0,0 +1,42 @@
+"""
+Streamlit-free response engine shared by every chatbot front-end.
+
+    from engine import respond
+    respond("hi there", {"rules": "simple"}).text
+
+Rule tables are registered by name: "hero", "simple" and "professional"
+are keyword tables, "trained" uses the training data. Front-ends can add
+their own with register_rules(). respond_stream() yields a reply in
+chunks, respond_batch() answers many messages at once, and
+`python -m engine.replay` replays a JSONL file of messages. Passing a
+METRICS.timer() as context["timer"] records the stage times of a turn.
+PROFILER.capture() profiles a turn on request, see engine.profiling.
+annotate() runs the staged NLU pipeline over a message, emotion_scorer
+scores its emotion intensities.
+"""
+
+from .core import (
+    DEFAULT_RULES,
+    KeywordRules,
+    Response,
+    get_rules,
+    register_rules,
+    register_rules_factory,
+    respond,
+    respond_in_process,
+    respond_stream,
+    text_chunks
+)
+from .nlu import (
+    check_for_crisis_keywords,
+    detect_conversation_type,
+    detect_issue,
+    extract_emotions,
+    extract_name
+)
+from .pipeline import Annotation, annotate, annotate_batch
+from .metrics import METRICS, NO_TIMER, dump_from_env
+from .profiling import PROFILER
+from . import rules
+from .trained import TrainedRules, load_trained_rules
+from .batch import respond_batch
@@ -0,0 +1,64 @@
+"""
+Batch responses for offline evaluation and bulk replay.
+Messages are answered in chunks, and chunks are spread over a process pool
+when workers is above 1. Worker processes see the built-in rule tables;
+tables registered at runtime are only visible to forked workers.
+"""
+
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .core import respond_in_process
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _respond_chunk(messages, context, seed):
+    if seed is not None:
+        random.seed(seed)
+    return respond_in_process(messages, context)
+
+
+def iter_respond_batches(chunks, context=None, workers=1, seed=None):
+    """Yield the responses for each chunk of messages, in order
+
+    With workers > 1 the chunks run on a process pool, with at most two
+    chunks per worker in flight so arbitrarily long inputs stream through.
+    When seed is given, chunk i draws its variants from seed + i.
+    """
+    def chunk_seed(index):
+        return None if seed is None else seed + index
+
+    if workers <= 1:
+        for index, chunk in enumerate(chunks):
+            yield _respond_chunk(chunk, context, chunk_seed(index))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for index, chunk in enumerate(chunks):
+            pending.append(executor.submit(_respond_chunk, chunk, context, chunk_seed(index)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def respond_batch(messages, context=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    """Answer every message with one rule table; returns a list of Responses"""
+    replies = []
+    for chunk_replies in iter_respond_batches(chunked(messages, chunk_size), context, workers, seed):
+        replies.extend(chunk_replies)
+    return replies
@@ -0,0 +1,118 @@
+"""
+Bounded cache from a normalized message to its routing result.
+Rule tables cache what they matched for a message, never the reply text, so
+the response variant is still drawn on every call. Each rule table owns its
+cache; reloading a table's data builds a new table with an empty cache.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+NON_WORD_PATTERN = re.compile(r"[^\w']+")
+# The same folding for ASCII text as one bytes.translate table: letters are
+# lowercased and every other non-word character becomes a space
+ASCII_FOLD = bytes(
+    ord(chr(code).lower()) if chr(code).isalnum() or chr(code) in "_'" else ord(" ")
+    for code in range(128)
+) + b" " * 128
+
+MISSING = object()
+
+
+def message_words(message):
+    """Return the words of message with case and punctuation folded"""
+    if message.isascii():
+        return message.encode().translate(ASCII_FOLD).decode().split()
+    return NON_WORD_PATTERN.sub(" ", message.lower().replace("’", "'")).split()
+
+
+def normalize_message(message):
+    """Fold case, punctuation and whitespace; apostrophes are kept"""
+    return " ".join(message_words(message))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds
+
+    maxsize 0 disables caching; ttl None keeps entries until evicted.
+    """
+
+    def __init__(self, maxsize=4096, ttl=3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if not self.maxsize:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is MISSING:
+            value = compute(key)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+def cache_from_env(name, generation=""):
+    """Build the cache for rule table name from the RESPONSE_CACHE_* settings
+
+    RESPONSE_CACHE_BACKEND=shared shares one cache per table between every
+    process on the host; generation identifies the table's data there.
+    Platforms without flock fall back to a per-process cache.
+    """
+    maxsize = int(os.getenv("RESPONSE_CACHE_SIZE", "4096"))
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    ttl = ttl if ttl > 0 else None
+    if maxsize and os.getenv("RESPONSE_CACHE_BACKEND", "local") == "shared":
+        try:
+            from .shared_cache import SharedResponseCache
+        except ImportError:
+            pass
+        else:
+            return SharedResponseCache(name, maxsize, ttl, generation, os.getenv("RESPONSE_CACHE_DIR"))
+    return ResponseCache(maxsize, ttl)
@@ -0,0 +1,224 @@
+"""
+Core of the response engine: the Response record, keyword rule tables and
+the registry that front-ends pick their rule table from.
+"""
+
+import random
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from fuzzy_matcher import TypoCorrector, load_known_words
+from intent_scoring import IntentScore, IntentScorer
+from resources import CRISIS_RESPONSES
+
+from .cache import MISSING, cache_from_env, message_words, normalize_message
+from .metrics import NO_TIMER
+from .nlu import CRISIS_KEYWORDS
+
+DEFAULT_RULES = "hero"
+# Category every keyword table gets for the shared crisis keywords
+CRISIS_CATEGORY = "crisis"
+
+CHUNK_PATTERN = re.compile(r"\s*\S+\s*")
+
+
+@dataclass(frozen=True)
+class Response:
+    """Reply chosen for one message"""
+    text: str
+    rules: str
+    category: str = None
+    crisis: bool = False
+
+
+def pick(variants):
+    """Return one response variant; single variants skip the random draw"""
+    if len(variants) == 1:
+        return variants[0]
+    return random.choice(variants)
+
+
+class KeywordRules:
+    """Ordered keyword table mapping categories to response variants
+
+    keywords is an ordered {category: [keywords]} mapping, scored as an
+    IntentScorer: crisis categories win over all others, then the category
+    whose matched keywords weigh most, then the earlier category. Every
+    table also has a CRISIS_CATEGORY holding engine.nlu.CRISIS_KEYWORDS, the
+    same list the trained responder checks; it answers with
+    responses["crisis"] if the table has them, else resources.CRISIS_RESPONSES.
+    It comes last in table order, so on equal scores the table's own crisis
+    categories answer first. exact maps
+    whole messages to a category and is checked before the keywords are
+    scored. A response may be a single string or a list of variants.
+    Messages are matched in normalized form and the category of each
+    normalized message is cached. With typo_tolerant set, a message in which
+    no keyword matched as spelled has its misspelled keyword words corrected
+    and is matched again. A message that matched a keyword only has the
+    words of crisis keywords corrected, so a misspelled crisis word is never
+    missed; one that matched a crisis keyword is not corrected at all.
+    """
+
+    def __init__(self, name, keywords, responses, defaults, exact=None, crisis_categories=(),
+                 typo_tolerant=True):
+        self.name = name
+        keywords = dict(keywords)
+        keywords[CRISIS_CATEGORY] = list(keywords.get(CRISIS_CATEGORY, ())) + [
+            keyword for keyword in CRISIS_KEYWORDS if keyword not in keywords.get(CRISIS_CATEGORY, ())]
+        responses = {CRISIS_CATEGORY: CRISIS_RESPONSES, **responses}
+        self.keywords = MappingProxyType(keywords)
+        self.responses = MappingProxyType({
+            category: (variants,) if isinstance(variants, str) else tuple(variants)
+            for category, variants in responses.items()
+        })
+        self.defaults = tuple(defaults)
+        self.exact = MappingProxyType(dict(exact or {}))
+        self.crisis_categories = frozenset(crisis_categories) | {CRISIS_CATEGORY}
+        self.scorer = IntentScorer(self.keywords, self.crisis_categories)
+        self.corrector = self.crisis_corrector = None
+        if typo_tolerant:
+            keywords = [keyword for keywords in self.keywords.values() for keyword in keywords] + list(self.exact)
+            crisis_keywords = [keyword for category in self.crisis_categories
+                               for keyword in self.keywords.get(category, ())]
+            self.corrector = TypoCorrector.for_keywords(keywords, crisis_keywords)
+            # Keyword words are spelled right already; only crisis words are targets
+            keyword_words = {word for keyword in keywords for word in keyword.rstrip("*").split()}
+            self.crisis_corrector = TypoCorrector.for_keywords(
+                (), crisis_keywords, load_known_words() | keyword_words)
+        self.cache = cache_from_env(name, repr((dict(self.keywords), dict(self.exact), typo_tolerant)))
+
+    def _match(self, text, tokens=None):
+        """Return (category of an exact match or None, bitmask of matched keywords)"""
+        category = self.exact.get(text)
+        if category is not None:
+            return category, 0
+        if tokens is None:
+            tokens = text.split()
+        features = self.scorer.match(text, tokens)
+        if self.corrector is None or features & self.scorer.crisis_features:
+            return None, features
+        corrector = self.crisis_corrector if features else self.corrector
+        corrected = corrector.correct_tokens(tokens)
+        if corrected is tokens:
+            return None, features
+        text = " ".join(corrected)
+        category = self.exact.get(text)
+        if category is not None:
+            return category, 0
+        return None, self.scorer.match(text, corrected)
+
+    def classify(self, text, tokens=None):
+        """Return the category for normalized text, or None; tokens are its words if split"""
+        category, features = self._match(text, tokens)
+        if category is not None:
+            return category
+        return self.scorer.best_of(features)
+
+    def rank(self, message):
+        """Return the IntentScore of every category message matches, best first"""
+        tokens = message_words(message)
+        category, features = self._match(" ".join(tokens), tokens)
+        if category is not None:
+            return [IntentScore(category, 1.0, 1.0)]
+        return self.scorer.rank_of(features)
+
+    def route(self, message):
+        """Return the category for message, cached on its normalized form"""
+        return self.cache.get_or_compute(normalize_message(message), self.classify)
+
+    def respond(self, message, context):
+        timer = context.get("timer", NO_TIMER)
+        tokens = message_words(message)
+        text = " ".join(tokens)
+        timer.mark("normalize")
+        category = self.cache.get(text)
+        if category is MISSING:
+            category = self.classify(text, tokens)
+            self.cache.put(text, category)
+        timer.mark("match")
+        response = self._select(category)
+        timer.mark("select")
+        return response
+
+    def respond_batch(self, messages, context):
+        """Respond to many messages, scoring every uncached text in one batch"""
+        texts = [normalize_message(message) for message in messages]
+        categories = {}
+        for text in texts:
+            if text not in categories:
+                categories[text] = self.cache.get(text)
+        missing = [text for text, category in categories.items() if category is MISSING]
+        prepared = [self._match(text) for text in missing]
+        scored = self.scorer.best_features([features for _, features in prepared])
+        for text, (category, _), best in zip(missing, prepared, scored):
+            categories[text] = best if category is None else category
+            self.cache.put(text, categories[text])
+        return [self._select(categories[text]) for text in texts]
+
+    def _select(self, category):
+        if category is None:
+            return Response(random.choice(self.defaults), self.name)
+        return Response(pick(self.responses[category]), self.name, category,
+                        category in self.crisis_categories)
+
+
+_rules = {}
+_factories = {}
+
+
+def register_rules(rules):
+    """Make a rule table available to respond() under rules.name"""
+    _rules[rules.name] = rules
+
+
+def register_rules_factory(name, factory):
+    """Register a loader that returns the rule table for name on demand"""
+    _factories[name] = factory
+
+
+def get_rules(name):
+    """Return the rule table registered under name"""
+    rules = _rules.get(name)
+    if rules is not None:
+        return rules
+    factory = _factories.get(name)
+    if factory is None:
+        raise KeyError(f"Unknown rule table: {name}")
+    return factory()
+
+
+def respond(message, context=None):
+    """Answer message with the rule table named by context["rules"]"""
+    context = context or {}
+    return get_rules(context.get("rules", DEFAULT_RULES)).respond(message, context)
+
+
+def respond_in_process(messages, context=None):
+    """Answer a list of messages with one rule table, in this process"""
+    context = context or {}
+    rules = get_rules(context.get("rules", DEFAULT_RULES))
+    respond_batch = getattr(rules, "respond_batch", None)
+    if respond_batch is not None:
+        return respond_batch(messages, context)
+    return [rules.respond(message, context) for message in messages]
+
+
+def text_chunks(text):
+    """Split text into word chunks that join back into text"""
+    return CHUNK_PATTERN.findall(text) or [text]
+
+
+def respond_stream(message, context=None):
+    """Yield the reply to message in text chunks as they become available
+
+    Rule tables with a respond_stream method stream their own chunks; the
+    reply of any other table is split into words.
+    """
+    context = context or {}
+    rules = get_rules(context.get("rules", DEFAULT_RULES))
+    stream = getattr(rules, "respond_stream", None)
+    if stream is not None:
+        yield from stream(message, context)
+        return
+    yield from text_chunks(rules.respond(message, context).text)
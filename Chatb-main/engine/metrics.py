@@ -0,0 +1,201 @@
+"""
+Per-turn latency metrics for the chat front-ends.
+A TurnTimer marks the end of each stage of a chat turn (normalize, match,
+crisis check, select, then render or serialize in the front-end), and
+finishing the turn adds its stage times to per-stage histograms in one
+locked update. METRICS_SAMPLE_EVERY=N times one turn in N (0 turns timing
+off); every turn is still counted. The histograms are exported in the
+Prometheus text format on /metrics, and the Streamlit apps, which serve no
+endpoint of their own, write the same text to a file every
+METRICS_DUMP_INTERVAL seconds. Other components add their own metrics to
+the same text with add_collector().
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DUMP_DIR = os.path.join(BASE_DIR, 'metrics')
+
+# Upper bounds in seconds; a cached keyword turn takes a few microseconds
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+           0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Histogram:
+    """Latency histogram: a count per bucket, plus the sum and count
+
+    Metrics.record() updates the fields inline under its lock, which saves a
+    method call per stage on the hot path.
+    """
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class TurnTimer:
+    """Stage times of one chat turn"""
+
+    __slots__ = ("metrics", "endpoint", "start", "last", "stages")
+
+    def __init__(self, metrics, endpoint):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.start = self.last = time.perf_counter()
+        self.stages = []
+
+    def mark(self, stage):
+        """End stage now; it covers the time since the previous mark
+
+        A stage marked several times, such as each chunk of a streamed
+        reply, is recorded once per mark.
+        """
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def finish(self):
+        self.metrics.record(self.endpoint, self.stages, self.last - self.start)
+
+
+class _NoTimer:
+    """Stands in for a TurnTimer on turns that are not timed"""
+
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def finish(self):
+        pass
+
+
+NO_TIMER = _NoTimer()
+
+
+class Metrics:
+    """Turn counts and stage latency histograms per endpoint"""
+
+    def __init__(self, sample_every=1):
+        self.sample_every = sample_every
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # {endpoint: turns counted}
+        self._turns = {}
+        # {endpoint: {stage: Histogram}}; the None stage is the whole turn
+        self._stages = {}
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """Append collector()'s list of Prometheus text lines to every render"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def timer(self, endpoint):
+        """Count a turn on endpoint; returns its TurnTimer, or NO_TIMER if unsampled"""
+        with self._lock:
+            turn = self._turns[endpoint] = self._turns.get(endpoint, 0) + 1
+        if not self.sample_every or turn % self.sample_every:
+            return NO_TIMER
+        return TurnTimer(self, endpoint)
+
+    def record(self, endpoint, stages, total):
+        with self._lock:
+            histograms = self._stages.get(endpoint)
+            if histograms is None:
+                histograms = self._stages[endpoint] = {None: Histogram()}
+            for stage, seconds in stages + [(None, total)]:
+                histogram = histograms.get(stage)
+                if histogram is None:
+                    histogram = histograms[stage] = Histogram()
+                histogram.counts[bisect_left(BUCKETS, seconds)] += 1
+                histogram.sum += seconds
+                histogram.count += 1
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = [
+            "# HELP chat_turns_total Chat turns answered.",
+            "# TYPE chat_turns_total counter"
+        ]
+        with self._lock:
+            for endpoint, turns in sorted(self._turns.items()):
+                lines.append(f'chat_turns_total{{endpoint="{endpoint}"}} {turns}')
+            endpoints = sorted(self._stages.items())
+            lines += [
+                "# HELP chat_turn_seconds Time to answer a sampled chat turn.",
+                "# TYPE chat_turn_seconds histogram"
+            ]
+            for endpoint, histograms in endpoints:
+                _histogram_lines(lines, "chat_turn_seconds", f'endpoint="{endpoint}"', histograms[None])
+            lines += [
+                "# HELP chat_stage_seconds Time spent in each stage of a sampled chat turn.",
+                "# TYPE chat_stage_seconds histogram"
+            ]
+            for endpoint, histograms in endpoints:
+                for stage, histogram in histograms.items():
+                    if stage is not None:
+                        _histogram_lines(lines, "chat_stage_seconds", f'endpoint="{endpoint}",stage="{stage}"', histogram)
+            collectors = list(self._collectors)
+        for collector in collectors:
+            lines += collector()
+        lines += [
+            "# HELP chat_process_start_time_seconds Start time of the process since the epoch.",
+            "# TYPE chat_process_start_time_seconds gauge",
+            f"chat_process_start_time_seconds {self.started}"
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(lines, name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def write_metrics(metrics, path):
+    """Write metrics.render() to path, replacing the previous dump atomically"""
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'w') as file:
+        file.write(metrics.render())
+    os.replace(temporary_path, path)
+
+
+def start_dump(metrics, path, interval=60.0):
+    """Write the metrics to path every interval seconds on a daemon thread"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def dump():
+        while True:
+            time.sleep(interval)
+            write_metrics(metrics, path)
+
+    thread = threading.Thread(target=dump, name="metrics-dump", daemon=True)
+    thread.start()
+    return thread
+
+
+def dump_from_env(name, metrics=None):
+    """Dump to METRICS_DUMP_DIR/<name>.prom every METRICS_DUMP_INTERVAL seconds
+
+    An interval of 0 turns the dump off and returns None.
+    """
+    interval = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))
+    if interval <= 0:
+        return None
+    path = os.path.join(os.getenv("METRICS_DUMP_DIR", DEFAULT_DUMP_DIR), f"{name}.prom")
+    return start_dump(metrics or METRICS, path, interval)
+
+
+METRICS = Metrics(int(os.getenv("METRICS_SAMPLE_EVERY", "16")))
@@ -0,0 +1,119 @@
+"""
+Message analysis helpers shared by the rule tables and train_chatbot.py:
+crisis and issue detection, conversation type, name and emotion extraction.
+Every keyword table is compiled once at import into a KeywordMatcher, which
+matches whole words; a trailing * matches any word starting with the keyword.
+"""
+
+from fuzzy_matcher import TypoCorrector, load_known_words
+from keyword_matcher import KeywordMatcher
+
+from .cache import NON_WORD_PATTERN, normalize_message
+
+# Keyword tables used to route a message, in priority order
+CRISIS_KEYWORDS = [
+    "suicide", "suicidal", "kill myself", "end my life", "hurt myself", "harm myself",
+    "don't want to live", "want to die", "better off dead", "no point in living",
+    "i don't want to be here anymore", "i wish i could disappear"
+]
+ISSUE_KEYWORDS = {
+    "depression": ["depress*", "sad*", "empty", "hopeless"],
+    "anxiety": ["anxi*", "worr*", "stress*", "panic*"]
+}
+
+# Compile every routing table into one index so a message is scanned once
+ROUTING_MATCHER = KeywordMatcher({"self_harm": CRISIS_KEYWORDS, **ISSUE_KEYWORDS})
+
+# Misspelled routing words are corrected before the scan. Issue keywords are
+# stems, so misspellings are corrected to these whole words containing them
+ISSUE_WORDS = ["depressed", "depression", "hopeless", "anxious", "anxiety",
+               "worried", "worrying", "stressed", "panicking"]
+ROUTING_CORRECTOR = TypoCorrector.for_keywords(ISSUE_WORDS, CRISIS_KEYWORDS)
+
+# Conversation types of the training data, in priority order
+CONVERSATION_TYPE_KEYWORDS = {
+    "crisis": ["crisis", "hotline*", "helpline*", "lifeline"],
+    "self_care": ["self-care", "self care", "burnt out", "burned out", "take better care of myself"],
+    "coping": ["struggling with", "deal with", "cope", "coping", "manage my", "managing"],
+    "greeting": ["hi", "hello", "hey", "good morning", "good evening"]
+}
+EMOTION_KEYWORDS = {
+    "sad": ["sad*", "depress*", "down", "unhappy", "cry*", "cried", "hopeless", "empty"],
+    "anxious": ["anxi*", "worr*", "nervous", "panic*", "scared", "afraid", "fear*"],
+    "stressed": ["stress*", "pressure*", "burnt out", "burned out"],
+    "overwhelmed": ["overwhelm*", "too much"],
+    "lonely": ["lonely", "alone", "isolated"],
+    "angry": ["angry", "mad", "furious", "frustrat*", "annoyed"],
+    "confused": ["confus*", "lost", "unsure"],
+    "happy": ["happy", "glad", "great", "excited", "joy*"]
+}
+
+# Phrases a user introduces themselves with; the next word is their name
+NAME_INTRODUCTIONS = (("my", "name", "is"), ("call", "me"), ("i", "am", "called"))
+
+
+CONVERSATION_TYPE_MATCHER = KeywordMatcher(CONVERSATION_TYPE_KEYWORDS)
+EMOTION_MATCHER = KeywordMatcher(EMOTION_KEYWORDS)
+
+
+def routing_hits(text):
+    """Return the routing categories of normalized text, correcting typos first"""
+    return tuple(ROUTING_MATCHER.find_all(ROUTING_CORRECTOR.correct(text)))
+
+
+def cased_words(text):
+    """Split text like normalize_message() does, keeping the case of each word"""
+    return NON_WORD_PATTERN.sub(" ", text.replace("’", "'")).split()
+
+
+def name_in(tokens, cased=None):
+    """Return the name introduced in a list of normalized words, or None
+
+    cased holds the same words with their original case. A common English
+    word after an introduction ("call me maybe") is only a name when it is
+    capitalized ("call me Hope").
+    """
+    if cased is not None and len(cased) != len(tokens):
+        cased = None
+    for position in range(len(tokens)):
+        for introduction in NAME_INTRODUCTIONS:
+            end = position + len(introduction)
+            if end < len(tokens) and tuple(tokens[position:end]) == introduction and tokens[end][0].isalpha():
+                if tokens[end] in load_known_words() and not (cased and cased[end][0].isupper()):
+                    continue
+                return tokens[end].capitalize()
+    return None
+
+
+# Function to check for crisis keywords
+def check_for_crisis_keywords(text, hits=None):
+    if hits is None:
+        hits = routing_hits(normalize_message(text))
+    if "self_harm" in hits:
+        return True, "self_harm"
+    return False, None
+
+
+# Function to detect issues
+def detect_issue(text, hits=None):
+    if hits is None:
+        hits = routing_hits(normalize_message(text))
+    for issue in ISSUE_KEYWORDS:
+        if issue in hits:
+            return issue
+    return "general"
+
+
+# Function to detect which kind of training conversation a message belongs to
+def detect_conversation_type(text):
+    return CONVERSATION_TYPE_MATCHER.first(normalize_message(text))
+
+
+# Function to extract a name the user introduces themselves with
+def extract_name(text):
+    return name_in(normalize_message(text).split(), cased_words(text))
+
+
+# Function to extract the emotions mentioned in a message
+def extract_emotions(text):
+    return EMOTION_MATCHER.find_all(normalize_message(text))
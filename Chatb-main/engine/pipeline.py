@@ -0,0 +1,160 @@
+"""
+Staged analysis of a message into one Annotation.
+The message is normalized and split into words once; every stage reads that
+shared buffer, and the crisis and issue stages share one routing scan. The
+stages run in order (crisis, emotions, name, conversation type, issue,
+emotion scores), each is timed, and any of them can be skipped. Emotion
+scores need numpy (see emotion_scorer) and are left empty without it;
+annotate_batch scores every message of a batch in one vectorized call:
+
+    annotation = annotate("Hi, my name is Sam and I feel anxious")
+    annotation.emotions, annotation.name, annotation.timings
+    annotate_batch(messages, skip={"name"})
+"""
+
+import functools
+import time
+from dataclasses import dataclass, field, replace
+
+from .cache import normalize_message
+from .nlu import (
+    CONVERSATION_TYPE_MATCHER,
+    EMOTION_MATCHER,
+    ISSUE_KEYWORDS,
+    ROUTING_CORRECTOR,
+    ROUTING_MATCHER,
+    cased_words,
+    name_in
+)
+
+STAGES = ("crisis", "emotions", "name", "conversation_type", "issue", "emotion_scores")
+
+
+class MessageBuffer:
+    """A message normalized and split once, shared by every stage"""
+
+    __slots__ = ("message", "text", "tokens", "_routing_hits")
+
+    def __init__(self, message):
+        self.message = message
+        self.text = normalize_message(message)
+        self.tokens = self.text.split()
+        self._routing_hits = None
+
+    @property
+    def routing_hits(self):
+        """Routing categories of the message with typos corrected, scanned once"""
+        if self._routing_hits is None:
+            corrected = [ROUTING_CORRECTOR.correct_word(token) for token in self.tokens]
+            self._routing_hits = tuple(ROUTING_MATCHER.find_all(corrected))
+        return self._routing_hits
+
+
+@dataclass(frozen=True)
+class Annotation:
+    """Everything the pipeline found in one message; skipped stages keep their defaults"""
+    text: str
+    crisis: bool = False
+    crisis_type: str = None
+    emotions: tuple = ()
+    name: str = None
+    conversation_type: str = None
+    issue: str = None
+    # (emotion, intensity) for every emotion of the lexicon scored above zero
+    emotion_scores: tuple = ()
+    # (stage, seconds) for every stage that ran
+    timings: tuple = field(default=(), compare=False)
+
+
+def _crisis(buffer):
+    if "self_harm" in buffer.routing_hits:
+        return {"crisis": True, "crisis_type": "self_harm"}
+    return {}
+
+
+def _emotions(buffer):
+    return {"emotions": tuple(EMOTION_MATCHER.find_all(buffer.tokens))}
+
+
+def _name(buffer):
+    return {"name": name_in(buffer.tokens, cased_words(buffer.message))}
+
+
+def _conversation_type(buffer):
+    return {"conversation_type": CONVERSATION_TYPE_MATCHER.first(buffer.tokens)}
+
+
+def _issue(buffer):
+    hits = buffer.routing_hits
+    return {"issue": next((issue for issue in ISSUE_KEYWORDS if issue in hits), "general")}
+
+
+@functools.lru_cache(maxsize=None)
+def _emotion_scorer_loader():
+    try:
+        from emotion_scorer import load_emotion_scorer
+    except ImportError:
+        return None
+    return load_emotion_scorer
+
+
+def _scored_emotions(scorer, row):
+    return tuple((emotion, score) for emotion, score in zip(scorer.emotions, row.tolist()) if score > 0)
+
+
+def _emotion_scores(buffer):
+    loader = _emotion_scorer_loader()
+    if loader is None:
+        return {}
+    scorer = loader()
+    return {"emotion_scores": _scored_emotions(scorer, scorer.score_tokens([buffer.tokens])[0])}
+
+
+STAGE_FUNCTIONS = {
+    "crisis": _crisis,
+    "emotions": _emotions,
+    "name": _name,
+    "conversation_type": _conversation_type,
+    "issue": _issue,
+    "emotion_scores": _emotion_scores
+}
+
+
+def annotate(message, skip=()):
+    """Run every stage not named in skip over message"""
+    unknown = set(skip).difference(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown NLU stage: {', '.join(sorted(unknown))}")
+    start = time.perf_counter()
+    buffer = MessageBuffer(message)
+    now = time.perf_counter()
+    timings = [("normalize", now - start)]
+    fields = {}
+    for stage in STAGES:
+        if stage in skip:
+            continue
+        fields.update(STAGE_FUNCTIONS[stage](buffer))
+        start, now = now, time.perf_counter()
+        timings.append((stage, now - start))
+    return Annotation(buffer.text, timings=tuple(timings), **fields)
+
+
+def annotate_batch(messages, skip=()):
+    """Annotate many messages, analysing each distinct message once"""
+    loader = _emotion_scorer_loader()
+    batch_scores = loader is not None and "emotion_scores" not in skip
+    stage_skip = set(skip) | {"emotion_scores"} if batch_scores else skip
+    annotations = {}
+    for message in messages:
+        if message not in annotations:
+            annotations[message] = annotate(message, stage_skip)
+    if batch_scores and annotations:
+        start = time.perf_counter()
+        scorer = loader()
+        rows = scorer.score_batch([annotation.text for annotation in annotations.values()])
+        # The batch time is shared evenly between the messages
+        timing = ("emotion_scores", (time.perf_counter() - start) / len(annotations))
+        for (message, annotation), row in zip(annotations.items(), rows):
+            annotations[message] = replace(annotation, emotion_scores=_scored_emotions(scorer, row),
+                                           timings=annotation.timings + (timing,))
+    return [annotations[message] for message in messages]
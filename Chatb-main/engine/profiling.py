@@ -0,0 +1,213 @@
+"""
+Opt-in profiling of live chat turns, written as collapsed stacks.
+A request that carries the PROFILE_TOKEN secret (an X-Profile header or a
+profile query parameter) is traced call by call, and every stack is written
+with the microseconds spent in it. Asking for profile_seconds instead samples
+the stacks of every thread in the process for that long, so slow turns
+served by other requests are caught too. Output files are in the
+"frame;frame;frame value" format that flamegraph.pl and speedscope read.
+Profiling is off unless PROFILE_TOKEN is set, and at most one capture may
+start every PROFILE_MIN_INTERVAL seconds.
+"""
+
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+_DONE = object()
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+
+
+def frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def write_collapsed(path, stacks):
+    """Write {stack: value} as collapsed stacks, skipping zero values"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as file:
+        for stack, value in sorted(stacks.items()):
+            if value > 0:
+                file.write(f"{stack} {value}\n")
+
+
+class StackTracer:
+    """Traces the calls made on the current thread, summing self time per stack"""
+
+    def __init__(self):
+        self.stacks = Counter()
+        self._names = []
+        # [start, time spent in callees] for each open call
+        self._calls = []
+
+    def _event(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == "call":
+            self._names.append(frame_name(frame.f_code))
+            self._calls.append([now, 0.0])
+        elif event == "c_call":
+            self._names.append(f"{getattr(arg, '__qualname__', arg)} (builtin)")
+            self._calls.append([now, 0.0])
+        elif self._calls:
+            # return, c_return and c_exception close the innermost call; calls
+            # that were already open when tracing started are not counted
+            start, callees = self._calls.pop()
+            elapsed = now - start
+            self.stacks[";".join(self._names)] += round((elapsed - callees) * 1e6)
+            self._names.pop()
+            if self._calls:
+                self._calls[-1][1] += elapsed
+
+    def __enter__(self):
+        sys.setprofile(self._event)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(None)
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks of every other thread every interval seconds"""
+
+    def __init__(self, path, seconds, interval=0.005, on_done=None):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.path = path
+        self.seconds = seconds
+        self.interval = interval
+        self.on_done = on_done
+        self.stacks = Counter()
+        self._names = {}
+
+    def _stack(self, frame):
+        names = []
+        while frame is not None:
+            name = self._names.get(frame.f_code)
+            if name is None:
+                name = self._names[frame.f_code] = frame_name(frame.f_code)
+            names.append(name)
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def run(self):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.stacks[self._stack(frame)] += 1
+            time.sleep(self.interval)
+        if self.on_done is not None:
+            self.on_done(self)
+
+
+class Capture:
+    """Context manager around one request; path is set when it profiles"""
+
+    def __init__(self, path=None, tracer=None):
+        self.path = path
+        self._tracer = tracer
+
+    def __enter__(self):
+        if self._tracer is not None:
+            self._tracer.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._tracer is not None:
+            self._tracer.__exit__(*exc_info)
+            write_collapsed(self.path, self._tracer.stacks)
+
+    def wrap(self, iterator):
+        """Yield from iterator, tracing each step; for streamed responses"""
+        if self._tracer is None:
+            yield from iterator
+            return
+        iterator = iter(iterator)
+        try:
+            while True:
+                with self._tracer:
+                    item = next(iterator, _DONE)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            write_collapsed(self.path, self._tracer.stacks)
+
+
+class Profiler:
+    """Hands out rate-limited captures to requests that present the token"""
+
+    def __init__(self, token=None, directory=DEFAULT_PROFILE_DIR, min_interval=60.0,
+                 max_seconds=60.0, sample_interval=0.005):
+        self.token = token
+        self.directory = directory
+        self.min_interval = min_interval
+        self.max_seconds = max_seconds
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+        self._sampler = None
+
+    def _allow(self, token, seconds):
+        if not self.token or not token or not hmac.compare_digest(str(token).encode(), self.token.encode()):
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_allowed or self._sampler is not None:
+                return False
+            self._next_allowed = now + max(self.min_interval, seconds)
+            return True
+
+    def _path(self, label):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return os.path.join(self.directory, f"{stamp}-{label}-{os.getpid()}.folded")
+
+    def _sampling_done(self, sampler):
+        write_collapsed(sampler.path, sampler.stacks)
+        with self._lock:
+            self._sampler = None
+
+    def capture(self, label, token, seconds=None):
+        """Return the Capture for one request
+
+        Without a valid token, or while rate limited, the capture does
+        nothing. With seconds, the whole process is sampled for that long
+        (at most max_seconds) in the background; otherwise the request
+        itself is traced.
+        """
+        try:
+            seconds = min(max(float(seconds), 0.0), self.max_seconds) if seconds else 0.0
+        except ValueError:
+            seconds = 0.0
+        if not self._allow(token, seconds):
+            return Capture()
+        path = self._path(label)
+        if not seconds:
+            return Capture(path, StackTracer())
+        sampler = StackSampler(path, seconds, self.sample_interval, self._sampling_done)
+        with self._lock:
+            self._sampler = sampler
+        sampler.start()
+        return Capture(path)
+
+
+def profiler_from_env():
+    """Build the Profiler from the PROFILE_* settings; off without PROFILE_TOKEN"""
+    return Profiler(
+        os.getenv("PROFILE_TOKEN") or None,
+        os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR),
+        float(os.getenv("PROFILE_MIN_INTERVAL", "60")),
+        float(os.getenv("PROFILE_MAX_SECONDS", "60")),
+        float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+    )
+
+
+PROFILER = profiler_from_env()
@@ -0,0 +1,77 @@
+"""
+Replay a JSONL file of messages through the response engine.
+
+    python -m engine.replay messages.jsonl results.jsonl --rules trained --workers 4
+
+Each input line is a JSON object with a "message" field (or a bare JSON
+string). Each output line is the input object with the engine's "response",
+"rules", "category" and "crisis" added.
+"""
+
+import argparse
+import json
+import sys
+from collections import deque
+
+from .batch import DEFAULT_CHUNK_SIZE, chunked, iter_respond_batches
+
+
+def _read_records(lines, field):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            record = {field: record}
+        yield record
+
+
+def replay_jsonl(input_file, output_file, context=None, field="message", workers=1,
+                 chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    """Stream JSONL records through the engine and write JSONL results"""
+    record_chunks = chunked(_read_records(input_file, field), chunk_size)
+    pending_records = deque()
+
+    def message_chunks():
+        for records in record_chunks:
+            pending_records.append(records)
+            yield [str(record.get(field, "")) for record in records]
+
+    count = 0
+    for replies in iter_respond_batches(message_chunks(), context, workers, seed):
+        for record, reply in zip(pending_records.popleft(), replies):
+            record.update(response=reply.text, rules=reply.rules,
+                          category=reply.category, crisis=reply.crisis)
+            output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += len(replies)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a JSONL file of messages through the response engine")
+    parser.add_argument("input", help="JSONL file of messages, or - for stdin")
+    parser.add_argument("output", help="JSONL file to write results to, or - for stdout")
+    parser.add_argument("--rules", default=None, help="rule table to answer with (default: hero)")
+    parser.add_argument("--field", default="message", help="record field holding the message")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="messages per chunk")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible variant selection")
+    args = parser.parse_args(argv)
+
+    context = {"rules": args.rules} if args.rules else {}
+    input_file = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    output_file = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    try:
+        count = replay_jsonl(input_file, output_file, context, args.field,
+                             args.workers, args.chunk_size, args.seed)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f"Replayed {count} messages", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
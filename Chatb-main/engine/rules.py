@@ -0,0 +1,49 @@
+"""
+Built-in keyword rule tables for the Streamlit front-ends.
+"""
+
+import hero_responses
+import professional_responses
+import simple_responses
+
+from .core import KeywordRules, register_rules
+
+if set(hero_responses.RESPONSES) & set(hero_responses.EMOTIONAL_KEYWORDS):
+    raise ValueError("A hero phrase is also an emotional keyword")
+
+# Emotional keywords that also match longer words ("depressed", "bullying")
+HERO_STEMS = {"depress", "bully", "sad"}
+
+# Sunshine portal: every phrase and emotional keyword is its own category.
+# Phrases outrank emotional keywords, and a message equal to a phrase is
+# answered by that phrase before anything else is considered
+HERO_RULES = KeywordRules(
+    "hero",
+    {key: [key + "*" if key in HERO_STEMS else key]
+     for table in (hero_responses.RESPONSES, hero_responses.EMOTIONAL_KEYWORDS) for key in table},
+    {**hero_responses.RESPONSES, **hero_responses.EMOTIONAL_KEYWORDS},
+    hero_responses.DEFAULT_RESPONSES,
+    exact={key: key for key in hero_responses.RESPONSES},
+    crisis_categories=[
+        "i want to die", "i wanna die", "i want to kill myself", "i'm suicidal",
+        "die", "suicide", "kill myself", "end it all"
+    ]
+)
+
+SIMPLE_RULES = KeywordRules(
+    "simple",
+    simple_responses.KEYWORDS,
+    simple_responses.RESPONSES,
+    simple_responses.RESPONSES["default"]
+)
+
+PROFESSIONAL_RULES = KeywordRules(
+    "professional",
+    professional_responses.KEYWORDS,
+    professional_responses.RESPONSES,
+    professional_responses.RESPONSES["friendly"]
+)
+
+register_rules(HERO_RULES)
+register_rules(SIMPLE_RULES)
+register_rules(PROFESSIONAL_RULES)
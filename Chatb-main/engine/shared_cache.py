@@ -0,0 +1,186 @@
+"""
+Routing cache shared by every process on a host.
+The cache is a memory-mapped file (in /dev/shm where available), so
+gunicorn or Streamlit workers attach to the same entries instead of each
+warming their own. It has the same interface as ResponseCache. The
+read-only training data needs no copy here: the response bundle is
+already memory-mapped read-only (see response_bundle), so its pages are
+shared through the page cache.
+
+The file is a fixed table of slots grouped into sets of WAYS. A key hashes
+to one set; a new entry takes an empty or expired slot there, else the slot
+that expires first. Reads take no lock: each slot carries a sequence number
+that writers make odd while they write, and a reader that sees an odd or
+changed sequence counts a miss. Writers serialize on an flock of the file.
+The file name carries the geometry, so workers configured with another
+cache size use another file; a file that is attached is never resized,
+only replaced. Values are stored as JSON, so they come back with lists in
+place of tuples.
+
+Slot layout: sequence (u32), key hash (u64), expiry time (f64, wall clock),
+payload length (u16), padding, payload.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+
+from .cache import MISSING
+
+MAGIC = b"CHBCACHE"
+HEADER = struct.Struct("<8sII")
+SLOT_HEADER = struct.Struct("<IQdH")
+SLOT_HEADER_SIZE = 24
+SLOT_SIZE = 256
+WAYS = 4
+
+
+def default_directory():
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class SharedResponseCache:
+    """Set-associative cache in a memory-mapped file shared across processes
+
+    generation is mixed into every key, so a table whose data changed stops
+    seeing entries written for the old data. Hit and miss counters are kept
+    per process.
+    """
+
+    def __init__(self, name, maxsize=4096, ttl=3600.0, generation="", directory=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._salt = hashlib.blake2b(generation.encode('utf-8'), digest_size=16).digest()
+        self.hits = 0
+        self.misses = 0
+        self.sets = max(1, math.ceil(maxsize / WAYS))
+        file_name = "chatb-cache-" + re.sub(r"[^\w-]", "_", name)
+        self.path = os.path.join(directory or default_directory(),
+                                 f"{file_name}-{self.sets}x{WAYS}x{SLOT_SIZE}")
+        size = HEADER.size + self.sets * WAYS * SLOT_SIZE
+        header = HEADER.pack(MAGIC, self.sets, SLOT_SIZE)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            file_size = os.fstat(self._fd).st_size
+            if file_size == 0:
+                # Just created, so nobody has it mapped yet
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, header, 0)
+            elif file_size != size or os.pread(self._fd, HEADER.size, 0) != header:
+                # Other processes may have the bad file mapped, and shrinking
+                # it would crash them; swap a fresh file in under the name
+                self._replace_file(size, header)
+        self._mmap = mmap.mmap(self._fd, size)
+
+    def _replace_file(self, size, header):
+        fd, temporary_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".",
+                                              dir=os.path.dirname(self.path))
+        try:
+            os.ftruncate(fd, size)
+            os.pwrite(fd, header, 0)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.close(fd)
+            os.remove(temporary_path)
+            raise
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = fd
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _hash(self, key):
+        # Never 0, which marks an empty slot
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8, salt=self._salt).digest()
+        return int.from_bytes(digest, 'little') | 1
+
+    def _slots(self, key_hash):
+        first = HEADER.size + (key_hash >> 1) % self.sets * WAYS * SLOT_SIZE
+        return range(first, first + WAYS * SLOT_SIZE, SLOT_SIZE)
+
+    def get(self, key, default=MISSING):
+        key_hash = self._hash(key)
+        buffer = self._mmap
+        for offset in self._slots(key_hash):
+            sequence, slot_hash, expires, length = SLOT_HEADER.unpack_from(buffer, offset)
+            if slot_hash != key_hash or sequence & 1:
+                continue
+            start = offset + SLOT_HEADER_SIZE
+            payload = buffer[start:start + length]
+            if SLOT_HEADER.unpack_from(buffer, offset)[0] != sequence or expires <= time.time():
+                break
+            self.hits += 1
+            return json.loads(payload)
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        if not self.maxsize:
+            return
+        payload = json.dumps(value).encode('utf-8')
+        if len(payload) > SLOT_SIZE - SLOT_HEADER_SIZE:
+            return
+        key_hash = self._hash(key)
+        expires = math.inf if self.ttl is None else time.time() + self.ttl
+        buffer = self._mmap
+        with self._locked():
+            now = time.time()
+            occupied = []
+            for offset in self._slots(key_hash):
+                sequence, slot_hash, slot_expires, _ = SLOT_HEADER.unpack_from(buffer, offset)
+                if slot_hash in (key_hash, 0) or slot_expires <= now:
+                    break
+                occupied.append((slot_expires, offset, sequence))
+            else:
+                _, offset, sequence = min(occupied)
+            # An odd sequence tells readers the slot is being written; a writer
+            # that died mid-write may have left it odd already
+            writing = sequence | 1
+            struct.pack_into("<I", buffer, offset, writing)
+            start = offset + SLOT_HEADER_SIZE
+            buffer[start:start + len(payload)] = payload
+            SLOT_HEADER.pack_into(buffer, offset, writing, key_hash, expires, len(payload))
+            struct.pack_into("<I", buffer, offset, (writing + 1) & 0xFFFFFFFF)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is MISSING:
+            value = compute(key)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry, for all processes, and reset this process's counters"""
+        with self._locked():
+            self._mmap[HEADER.size:] = bytes(len(self._mmap) - HEADER.size)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        size = sum(1 for offset in range(HEADER.size, len(self._mmap), SLOT_SIZE)
+                   if SLOT_HEADER.unpack_from(self._mmap, offset)[1])
+        return {
+            "size": size,
+            "maxsize": self.sets * WAYS,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "path": self.path
+        }
@@ -0,0 +1,162 @@
+"""
+Rule table backed by the trained chatbot data and the Earkick responses.
+"""
+
+import importlib
+import os
+import random
+
+from resource_cache import cached_on_files, file_version
+from response_bundle import load_training
+from training_index import TrainingIndex
+
+from .cache import MISSING, cache_from_env, normalize_message
+from .core import Response, pick, register_rules_factory
+from .metrics import NO_TIMER
+from .nlu import check_for_crisis_keywords, detect_issue, routing_hits
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINING_DATA_PATH = os.path.join(BASE_DIR, 'trained_chatbot_data.json')
+TRAINING_BUNDLE_PATH = os.path.join(BASE_DIR, 'trained_chatbot_data.bin')
+EARKICK_RESPONSES_PATH = os.path.join(BASE_DIR, 'earkick_responses.py')
+
+GENERAL_RESPONSES = (
+    "I hear you. Would you like to tell me more about that?",
+    "That sounds challenging. How are you feeling about it?",
+    "I'm here to listen. What would be most helpful for you right now?",
+    "Thank you for sharing that with me. Would you like to explore this further?",
+    "I understand this is important to you. How can I best support you?",
+    "That's a lot to deal with. What aspect is most difficult for you right now?",
+    "I appreciate you opening up about this. What would help you feel more supported?",
+    "It sounds like you're going through a tough time. What helps you cope when things get difficult?",
+    "I'm here to support you through this. What would be a small step toward feeling better?",
+    "Your feelings make complete sense given what you're experiencing. How can I help?"
+)
+
+
+class TrainedRules:
+    """Picks responses from the training data buckets and Earkick responses
+
+    Crisis messages get a warning-sign response, then an explicit
+    context["conversation_type"] is honoured, then the retriever (if any)
+    answers from the nearest training examples, then the detected issue picks
+    an Earkick or training response, and finally a general response is used.
+    The keyword hits and retrieved examples of each normalized message are
+    cached; the table is rebuilt, with an empty cache, when its data reloads.
+    """
+
+    name = "trained"
+
+    def __init__(self, training_index, earkick_responses, retriever=None, generation=""):
+        self.training_index = training_index
+        self.earkick_responses = earkick_responses
+        self.retriever = retriever
+        if retriever:
+            generation += repr((retriever.top_k, retriever.threshold))
+        self.cache = cache_from_env(self.name, generation)
+
+    def route(self, text):
+        """Return the (keyword hits, retrieved examples) for normalized text"""
+        retrieved = tuple(self.retriever.search(text)) if self.retriever else None
+        return routing_hits(text), retrieved
+
+    def respond(self, message, context):
+        timer = context.get("timer", NO_TIMER)
+        text = normalize_message(message)
+        timer.mark("normalize")
+        hits, retrieved = self.cache.get_or_compute(text, self.route)
+        timer.mark("match")
+        response = self._respond(text, hits, retrieved, context, timer)
+        timer.mark("select")
+        return response
+
+    def respond_batch(self, messages, context):
+        """Respond to many messages, scanning and scoring each uncached text once"""
+        texts = [normalize_message(message) for message in messages]
+        routes = {}
+        for text in texts:
+            if text not in routes:
+                routes[text] = self.cache.get(text)
+        missing = [text for text, route in routes.items() if route is MISSING]
+        retrieved = [None] * len(missing)
+        if self.retriever and missing:
+            retrieved = [tuple(hits) for hits in self.retriever.search_batch(missing)]
+        for text, text_retrieved in zip(missing, retrieved):
+            routes[text] = (routing_hits(text), text_retrieved)
+            self.cache.put(text, routes[text])
+        return [self._respond(text, *routes[text], context) for text in texts]
+
+    def _respond(self, user_input, hits, retrieved, context, timer=NO_TIMER):
+        # First check for crisis keywords
+        is_crisis, crisis_type = check_for_crisis_keywords(user_input, hits)
+        timer.mark("crisis")
+        if is_crisis:
+            crisis_response = self.training_index.random_for_type('warning_sign')
+            if crisis_response:
+                return Response(crisis_response, self.name, crisis_type, True)
+
+        # Then check conversation type
+        conversation_type = context.get("conversation_type")
+        if conversation_type:
+            type_response = self.training_index.random_for_type(conversation_type)
+            if type_response:
+                return Response(type_response, self.name, conversation_type)
+
+        # Then answer from the nearest training examples; a weak best match
+        # falls through to the Earkick and keyword responses below
+        if self.retriever:
+            retrieved_response = self.retriever.choose(retrieved)
+            if retrieved_response:
+                return Response(retrieved_response, self.name, "retrieval")
+
+        # Check for specific issues
+        issue = detect_issue(user_input, hits)
+        if issue != 'general':
+            # First check if we have specialized Earkick responses for this issue
+            if issue in self.earkick_responses:
+                return Response(pick(self.earkick_responses[issue]), self.name, issue)
+
+            # Then check training data
+            issue_response = self.training_index.random_for_issue(issue)
+            if issue_response:
+                return Response(issue_response, self.name, issue)
+
+        # Default to a general response
+        return Response(random.choice(GENERAL_RESPONSES), self.name, 'general')
+
+
+def load_retriever(training_index):
+    """Build the BM25 retriever when RESPONSE_MODE=retrieval, else None"""
+    if os.getenv("RESPONSE_MODE", "keyword") != "retrieval":
+        return None
+    try:
+        from retrieval import TrainingRetriever
+    except ImportError:
+        return None
+    return TrainingRetriever(
+        training_index,
+        int(os.getenv("RETRIEVAL_TOP_K", "5")),
+        float(os.getenv("RETRIEVAL_THRESHOLD", "5.0"))
+    )
+
+
+TRAINED_RULES_PATHS = (TRAINING_DATA_PATH, TRAINING_BUNDLE_PATH, EARKICK_RESPONSES_PATH)
+
+
+@cached_on_files(*TRAINED_RULES_PATHS)
+def load_trained_rules():
+    """Load the trained rule table; reloaded when any of its files change"""
+    version = file_version(*TRAINED_RULES_PATHS)
+    try:
+        training_index = load_training(TRAINING_DATA_PATH, TRAINING_BUNDLE_PATH)
+    except FileNotFoundError:
+        training_index = TrainingIndex([])
+    try:
+        import earkick_responses
+        earkick = importlib.reload(earkick_responses).EARKICK_RESPONSES
+    except ImportError:
+        earkick = {}
+    return TrainedRules(training_index, earkick, load_retriever(training_index), repr(version))
+
+
+register_rules_factory("trained", load_trained_rules)
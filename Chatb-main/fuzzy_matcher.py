@@ -0,0 +1,160 @@
+"""
+Typo-tolerant keyword matching for the chatbot responders.
+Before a message is scanned for keywords, each of its words that is not a
+keyword word itself is replaced by the keyword word it is a likely
+misspelling of, so "anxius", "depresed" and "sucide" still route. Candidates
+come from a SymSpell-style index of every string reachable by deleting up to
+two letters from a keyword word: a lookup generates the deletions of the
+message word and checks the few words they index, whatever the size of the
+vocabulary. Words in known_words.txt are correctly spelled English and are
+never corrected, so "giving" stays "giving" rather than becoming "living".
+Distinctive crisis words accept the most edits.
+"""
+
+import functools
+import os
+
+CORRECTION_CACHE_SIZE = 65536
+KNOWN_WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'known_words.txt')
+
+# Crisis words that are often misspelled and are not an edit or two away
+# from everyday words; the other words of crisis phrases ("living",
+# "better", "anymore") are corrected as cautiously as any keyword word
+CRISIS_WORDS = frozenset({"suicide", "suicidal", "disappear", "overdose"})
+
+
+@functools.lru_cache(maxsize=None)
+def load_known_words(path=KNOWN_WORDS_PATH):
+    """Return the set of words in a one-word-per-line file"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return frozenset(line.strip() for line in file if line.strip())
+
+
+def typo_tolerance(word, crisis=False):
+    """Edits allowed when matching word
+
+    Short words have too many real words one edit away ("die" and "did",
+    "live" and "like"), so they must be spelled exactly.
+    """
+    if crisis:
+        return 2 if len(word) >= 7 else 1 if len(word) >= 5 else 0
+    return 1 if len(word) >= 6 else 0
+
+
+def deletions(word, max_distance):
+    """Return word and every string made by deleting up to max_distance letters"""
+    variants = frontier = {word}
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:]
+                    for variant in frontier if len(variant) > 1 for i in range(len(variant))}
+        variants = variants | frontier
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance of a and b, or limit + 1 if above limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+class TypoCorrector:
+    """Deletion index over a {word: allowed edits} vocabulary
+
+    Tokens in known_words are left as they are. When a misspelling is as
+    close to several words, the word that allows more edits wins (crisis
+    words allow the most), then the alphabetically first, so corrections are
+    deterministic. Corrections of the last CORRECTION_CACHE_SIZE distinct
+    words are remembered.
+    """
+
+    def __init__(self, tolerances, known_words=()):
+        self.tolerances = {word: tolerance for word, tolerance in tolerances.items() if word}
+        self.known_words = frozenset(known_words)
+        self.max_distance = max(self.tolerances.values(), default=0)
+        self.max_length = max(map(len, self.tolerances), default=0) + self.max_distance
+        self._index = {}
+        self._corrections = {}
+        # Words known to need no correction; a message made only of these is
+        # returned as it is
+        self._unchanged = set(self.tolerances) | self.known_words
+        for word, tolerance in self.tolerances.items():
+            for variant in deletions(word, tolerance):
+                self._index.setdefault(variant, []).append(word)
+
+    @classmethod
+    def for_keywords(cls, keywords, crisis_keywords=(), known_words=None):
+        """Build a corrector for the words of keyword phrases
+
+        Words of crisis_keywords that are in CRISIS_WORDS get the crisis
+        tolerance. known_words defaults to the words in known_words.txt.
+        """
+        tolerances = {}
+        for crisis, phrases in ((False, keywords), (True, crisis_keywords)):
+            for phrase in phrases:
+                for word in phrase.rstrip("*").split():
+                    tolerance = typo_tolerance(word, crisis and word in CRISIS_WORDS)
+                    tolerances[word] = max(tolerances.get(word, 0), tolerance)
+        if known_words is None:
+            known_words = load_known_words()
+        return cls(tolerances, known_words)
+
+    def correct_word(self, token):
+        """Return the vocabulary word token is a misspelling of, or token"""
+        corrected = self._corrections.get(token)
+        if corrected is None:
+            if len(self._corrections) >= CORRECTION_CACHE_SIZE:
+                self._corrections.clear()
+                self._unchanged = set(self.tolerances) | self.known_words
+            corrected = self._corrections[token] = self._lookup(token)
+            if corrected == token:
+                self._unchanged.add(token)
+        return corrected
+
+    def _lookup(self, token):
+        if (token in self.tolerances or token in self.known_words
+                or not 3 <= len(token) <= self.max_length or not self.max_distance):
+            return token
+        best = None
+        checked = set()
+        for variant in deletions(token, self.max_distance):
+            for word in self._index.get(variant, ()):
+                if word in checked:
+                    continue
+                checked.add(word)
+                tolerance = self.tolerances[word]
+                distance = edit_distance(token, word, tolerance)
+                if distance <= tolerance:
+                    candidate = (distance, -tolerance, word)
+                    if best is None or candidate < best:
+                        best = candidate
+        return token if best is None else best[2]
+
+    def correct_tokens(self, tokens):
+        """Correct a list of words; returns tokens itself when no word changes"""
+        if self._unchanged.issuperset(tokens):
+            return tokens
+        # Remembered words are looked up in C; only new words take the slow path
+        corrected = list(map(self._corrections.get, tokens))
+        if None in corrected:
+            corrected = [self.correct_word(token) if word is None else word
+                         for token, word in zip(tokens, corrected)]
+        return tokens if corrected == tokens else corrected
+
+    def correct(self, text):
+        """Correct every word of normalized text (words separated by single spaces)"""
+        tokens = text.split(" ")
+        corrected = self.correct_tokens(tokens)
+        return text if corrected is tokens else " ".join(corrected)
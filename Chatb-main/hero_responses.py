@@ -0,0 +1,107 @@
+# Response tables for the Sunshine portal chatbot, compiled by the engine
+# Mental health focused responses with positive reinforcement
+RESPONSES = {
+    # Job stress and loss
+    "stressed about job": "I hear how overwhelming work stress can be. Remember, your well-being comes first. Here are some ways to cope: 🌟\n1. Take regular breaks\n2. Practice deep breathing\n3. Set clear boundaries\n4. Talk to someone you trust\n5. Focus on what you can control\nWould you like to talk more about what's stressing you? 💛",
+    "job stress": "Work stress can feel overwhelming, but remember - you've handled challenges before. Here's what might help: 🌟\n1. Break tasks into smaller steps\n2. Practice self-care\n3. Set realistic goals\n4. Take time to recharge\n5. Remember your worth isn't defined by work\nLet's talk about what's going on. 💫",
+    "fired from job": "I'm sorry to hear about your job loss. This can be really tough, but remember - this is just one chapter in your story. Here are some steps forward: 🌟\n1. Allow yourself to feel your emotions\n2. Update your resume\n3. Reach out to your network\n4. Take time to reflect\n5. Remember your skills and strengths\nWould you like to talk about your next steps? 💪",
+    "lost my job": "I hear how difficult this time is for you. Remember, your worth isn't defined by your job. Here's how to move forward: 🌟\n1. Process your feelings\n2. Update your skills\n3. Network with others\n4. Take care of yourself\n5. Stay positive and persistent\nYou've got this! 💛",
+
+    # Loss of loved ones
+    "death of loved one": "I'm so sorry for your loss. Grieving is a personal journey, and it's okay to feel however you feel. Here are some ways to cope: 🌟\n1. Allow yourself to grieve\n2. Talk about your loved one\n3. Take care of yourself\n4. Seek support from others\n5. Remember the good times\nWould you like to share memories of your loved one? 💛",
+    "lost someone": "I hear how painful this loss is for you. Grief takes time, and it's okay to feel whatever you're feeling. Here's what might help: 🌟\n1. Express your feelings\n2. Create a memory book\n3. Talk to supportive people\n4. Take things one day at a time\n5. Be gentle with yourself\nWould you like to talk about your loved one? 💫",
+    "someone died": "I'm deeply sorry for your loss. Grieving is a natural process, and there's no right way to do it. Here are some ways to cope: 🌟\n1. Share your feelings\n2. Create rituals to remember\n3. Seek support from others\n4. Take care of your health\n5. Be patient with yourself\nWould you like to talk about how you're feeling? 💛",
+
+    # School bullying
+    "school bully": "I'm so sorry you're experiencing bullying at school. Remember, you don't deserve this treatment. Here are some steps you can take: 🌟\n1. Talk to a trusted teacher or counselor\n2. Document the incidents\n3. Stay close to supportive friends\n4. Practice self-care\n5. Remember your worth isn't defined by their actions\nWould you like to talk more about what's happening? 💛",
+    "being bullied at school": "I hear how difficult this is for you. School should be a safe place. Here's what you can do: 🌟\n1. Tell a trusted adult about what's happening\n2. Keep a record of the incidents\n3. Stay with supportive friends\n4. Practice self-care activities\n5. Remember you're not alone in this\nWould you like to discuss how we can handle this situation? 💫",
+    "classmates bullying me": "I'm here to support you through this. Remember, their actions say more about them than about you. Here are some ways to cope: 🌟\n1. Build a support network\n2. Focus on your strengths\n3. Practice self-compassion\n4. Document the incidents\n5. Talk to school authorities\nYou're stronger than their words! 💪",
+
+    # Workplace bullying
+    "office bully": "I'm sorry you're experiencing bullying at work. This is unacceptable. Here are some steps you can take: 🌟\n1. Document all incidents\n2. Report to HR or management\n3. Stay professional\n4. Build a support network\n5. Know your rights\nWould you like to talk more about the situation? 💛",
+    "workplace bullying": "I hear how challenging this is. Your workplace should be professional and respectful. Here's what you can do: 🌟\n1. Keep detailed records\n2. Report to appropriate channels\n3. Stay focused on your work\n4. Seek support from colleagues\n5. Know your company's policies\nRemember, you deserve respect! 💫",
+    "boss bullying me": "I'm sorry you're experiencing this from someone in authority. This is not okay. Here are some steps: 🌟\n1. Document all interactions\n2. Report to HR or higher management\n3. Stay professional\n4. Know your rights\n5. Consider seeking legal advice\nWould you like to discuss your options? 💪",
+
+    # Online bullying
+    "cyberbully": "I'm sorry you're experiencing online bullying. This can be especially hurtful. Here's what you can do: 🌟\n1. Don't respond to the bully\n2. Save evidence (screenshots)\n3. Block and report the person\n4. Talk to someone you trust\n5. Take breaks from social media\nRemember, you're not alone in this! 💛",
+    "online bullying": "I hear how difficult this is. The online world should be safe for everyone. Here are some steps: 🌟\n1. Document all messages\n2. Report to platform moderators\n3. Block the person\n4. Take care of your mental health\n5. Talk to someone you trust\nWould you like to discuss how you're feeling? 💫",
+
+    # General bullying support
+    "i'm being bullied": "I'm so sorry you're going through this. Remember, their words don't define your worth. You are unique, valuable, and deserving of respect. Would you like to talk about what's happening? 💛",
+    "i'm getting bullied": "That's really tough, but remember - you are not alone in this. Your strength is greater than their words. Would you like to discuss how we can handle this situation? 🌟",
+    "people are bullying me": "I'm here to support you. Remember, you are worthy of love and respect. Let's talk about how you're feeling and what we can do. You're stronger than you think! 💪",
+
+    # Peace and mental health tips
+    "tips for peace": "Here are some ways to find peace: 🌟\n1. Practice deep breathing exercises\n2. Try meditation for 5-10 minutes daily\n3. Spend time in nature\n4. Keep a gratitude journal\n5. Listen to calming music\n6. Practice mindfulness in daily activities\n7. Connect with loved ones\n8. Take regular breaks from screens\n9. Exercise regularly\n10. Get enough sleep\nRemember, peace is a journey, not a destination. Start with small steps! 💫",
+    "how to find peace": "Finding peace starts with small steps: 🌟\n1. Accept your feelings without judgment\n2. Create a peaceful space at home\n3. Practice self-compassion\n4. Set healthy boundaries\n5. Focus on the present moment\n6. Let go of things you can't control\n7. Find activities that bring you joy\n8. Practice forgiveness\n9. Connect with nature\n10. Be kind to yourself\nPeace comes from within - you've got this! 💛",
+
+    # Crisis situations
+    "i want to die": "I'm really concerned about what you're going through. Your life is valuable and important. Please, let's talk about this. You're not alone, and there are people who care about you deeply. Would you like to talk about what's making you feel this way? 💛",
+    "i wanna die": "I hear how much pain you're in right now. Please know that your life matters, and there are people who want to help you through this. Let's talk about what's going on. You don't have to face this alone. 💛",
+    "i want to kill myself": "I'm very concerned about you. Your life is precious, and there are people who care about you. Please, let's talk about this. You don't have to go through this alone. Would you like to share what's making you feel this way? 💛",
+    "i'm suicidal": "I'm really worried about you. Your life is valuable, and there are people who want to help you through this difficult time. Let's talk about what's going on. You're not alone in this. 💛",
+
+    # Hopelessness and despair
+    "i don't know what to do": "I hear how lost you're feeling right now. It's okay to feel this way, but remember - you don't have to figure everything out alone. Let's talk through this together. What's been going on? 💛",
+    "i feel hopeless": "I understand you're feeling hopeless right now. Remember, feelings are temporary, even when they feel overwhelming. Let's talk about what's making you feel this way. You're stronger than you think. 🌟",
+    "i can't go on": "I hear how difficult things are for you right now. Please know that you don't have to face this alone. Let's talk about what's going on. There are people who care about you and want to help. 💛",
+    "i give up": "I understand you're feeling overwhelmed right now. It's okay to feel this way, but remember - you don't have to give up. Let's talk about what's making you feel this way. You're stronger than you think. 🌟",
+
+    # Depression related
+    "i'm depressed": "I hear you, and I want you to know that your feelings are valid. But remember, even in the darkest moments, there's always a way forward. You're stronger than you think! 💪 Would you like to talk about what's been going on? 💛",
+    "i feel depressed": "I'm here for you. Remember, every storm eventually passes, and you have the strength to weather this one. Let's take it one step at a time. What's been on your mind lately? 🌟",
+    "i'm feeling down": "It's okay to feel down sometimes. Just remember, you've overcome challenges before, and you can do it again. Would you like to share what's been bothering you? I'm here to listen. 💫",
+
+    # Sadness related
+    "i'm sad": "I'm here for you. Remember, it's okay to feel sad, but don't forget that brighter days are ahead. Would you like to talk about what's making you feel this way? 💛",
+    "i feel sad": "Your feelings are valid, and it's okay to feel this way. Just remember, every emotion is temporary, and you have the strength to get through this. Let's talk about what's on your mind. 🌟",
+    "i'm feeling sad": "It's okay to feel this way. Remember, you've overcome sadness before, and you can do it again. Would you like to share what's been bothering you? 💫",
+
+    # General emotional support
+    "i need help": "I'm here to help you. Remember, asking for help is a sign of strength, not weakness. What's going on? You're not alone in this. 💛",
+    "i feel lost": "I'm here to help you find your way. Remember, even when you feel lost, you're still moving forward. Would you like to talk about what's making you feel this way? 💫",
+
+    # Greetings and basic responses
+    "hi": "Hey there! 👋 How are you feeling today? Remember, every day is a new opportunity for growth!",
+    "hello": "Hi! I'm here to listen and support you. How can I help you today? 💛",
+    "help": "I'm here to chat about anything that's on your mind - your feelings, struggles, or just to listen. Remember, you're stronger than you think! 💫",
+    "bye": "Take care! Remember, you're capable of amazing things! Stay strong and keep shining! ✌️",
+    "thanks": "You're welcome! Remember, I'm always here to support you. Keep believing in yourself! 💛"
+}
+
+# Emotional keywords with positive reinforcement
+EMOTIONAL_KEYWORDS = {
+    "job": "I hear you're going through a tough time at work. Remember, your worth isn't defined by your job. Would you like to talk about what's happening? 💛",
+    "work": "Work can be challenging, but remember - you've overcome challenges before. Let's talk about what's going on. 💫",
+    "fired": "I'm sorry to hear about your job loss. This is a difficult time, but remember - this is just one chapter in your story. Would you like to talk about your next steps? 💪",
+    "death": "I'm so sorry for your loss. Grieving is a personal journey, and it's okay to feel however you feel. Would you like to talk about it? 💛",
+    "died": "I hear how painful this loss is for you. Would you like to share memories of your loved one? 💫",
+    "loss": "I'm here to support you through this difficult time. Would you like to talk about how you're feeling? 💛",
+    "bully": "I'm sorry you're experiencing this. Remember, you are worthy of love and respect. Let's talk about what's happening and how we can handle it. 🌟",
+    "bullied": "I hear you're going through a tough time. Remember, you don't deserve this treatment. Would you like to talk about what's happening? 💛",
+    "harassment": "I'm sorry you're experiencing this. This is not okay. Let's talk about what's happening and how we can address it. 💪",
+    "teasing": "I understand how hurtful this can be. Remember, their words don't define your worth. Would you like to talk about it? 💫",
+    "die": "I'm really concerned about what you're going through. Your life is valuable and important. Please, let's talk about this. You're not alone, and there are people who care about you deeply. 💛",
+    "suicide": "I'm very worried about you. Your life matters, and there are people who want to help you through this difficult time. Let's talk about what's going on. You don't have to face this alone. 💛",
+    "kill myself": "I'm deeply concerned about you. Please know that your life is precious, and there are people who care about you. Let's talk about what's making you feel this way. 💛",
+    "end it all": "I hear how much pain you're in right now. Please know that your life matters, and there are people who want to help you through this. Let's talk about what's going on. 💛",
+    "depress": "I hear you're feeling down. Remember, even in the darkest moments, there's always hope. Would you like to talk about what's been going on? 💛",
+    "sad": "It's okay to feel sad. Remember, brighter days are ahead. Would you like to share what's on your mind? 💫",
+    "hopeless": "I understand you're feeling hopeless right now. Remember, feelings are temporary, even when they feel overwhelming. Let's talk about what's making you feel this way. 💛",
+    "worthless": "You are not worthless. You are valuable and important. Let's talk about what's making you feel this way. 💛",
+    "alone": "You are not alone in this. I'm here to listen and support you. Let's talk about what's going on. 💫"
+}
+
+# Default supportive and motivational responses
+DEFAULT_RESPONSES = [
+    "I'm here to listen. Remember, you're stronger than you think! How are you feeling about this? 💛",
+    "That sounds tough, but I believe in your ability to handle this. Would you like to talk more about it? 🌟",
+    "I hear you. Remember, every challenge is an opportunity for growth. Let's work through this together. 💪",
+    "Your feelings are valid, and you're doing great by reaching out. What's been on your mind? 💫",
+    "I'm here to support you. Remember, you're capable of amazing things! How can I help? 💛",
+    "Let's talk about how you're feeling. Remember, you're not alone in this journey. 🌟",
+    "I'm listening. Remember, every step forward, no matter how small, is progress. What's been going on? 💫",
+    "You're not alone in this. Remember, you have the strength to overcome challenges. Let's talk about it. 💛",
+    "I'm here for you. Remember, you're doing better than you think. What's been bothering you? 🌟",
+    "Let's work through this together. Remember, you're stronger than any challenge you face. 💪"
+]
@@ -0,0 +1,192 @@
+"""
+Weighted multi-label intent scoring for the keyword rule tables.
+A table is a sparse keyword x intent weight matrix: every keyword a message
+contains adds its weight to each intent that lists it, so a message is
+scored for all intents at once instead of stopping at the first match.
+Intents are ranked by priority tier (crisis intents first), then score,
+then table order, so the result never depends on which keyword happened to
+be listed first. A batch of messages is scored with one sparse matrix
+product when numpy and scipy are installed.
+"""
+
+from dataclasses import dataclass
+
+from keyword_matcher import KeywordMatcher, keyword_words
+
+CRISIS_TIER = 0
+DEFAULT_TIER = 1
+
+
+@dataclass(frozen=True)
+class IntentScore:
+    """Score of one intent for a message; confidence is its share of all scores"""
+    intent: str
+    score: float
+    confidence: float
+
+
+def keyword_weight(keyword):
+    """Default weight of a keyword: phrases are more specific than words"""
+    return float(len(keyword_words(keyword.rstrip("*"))))
+
+
+class IntentScorer:
+    """Sparse keyword x intent weights over an ordered {intent: keywords} table
+
+    keywords may be a list, weighted by keyword_weight(), or a
+    {keyword: weight} mapping. tiers maps intents to a priority tier; lower
+    tiers always win, and crisis_intents are put in CRISIS_TIER.
+    """
+
+    def __init__(self, table, crisis_intents=(), tiers=None):
+        self.intents = list(table)
+        tiers = dict(tiers or {})
+        tiers.update((intent, CRISIS_TIER) for intent in crisis_intents)
+        self.tiers = [tiers.get(intent, DEFAULT_TIER) for intent in self.intents]
+        # With only the crisis and default tiers, the best intent is picked
+        # without sorting by tier
+        self._two_tiers = set(self.tiers) <= {CRISIS_TIER, DEFAULT_TIER}
+
+        # One matcher feature per distinct keyword; each feature's row lists
+        # the (intent index, weight) entries of the weight matrix
+        features = {}
+        for intent_index, keywords in enumerate(table.values()):
+            if not isinstance(keywords, dict):
+                keywords = {keyword: keyword_weight(keyword) for keyword in keywords}
+            for keyword, weight in keywords.items():
+                features.setdefault(keyword, []).append((intent_index, float(weight)))
+        self.features = list(features)
+        self.rows = [tuple(entries) for entries in features.values()]
+        self.matcher = KeywordMatcher({feature: [feature] for feature in self.features})
+        # Bitmask of the keywords that score a crisis intent
+        self.crisis_features = 0
+        for feature, entries in enumerate(self.rows):
+            if any(self.tiers[intent_index] == CRISIS_TIER for intent_index, _ in entries):
+                self.crisis_features |= 1 << feature
+        self._matrix = None
+
+    def match(self, text, tokens=None):
+        """Return the bitmask of the keywords in normalized text (see KeywordMatcher.scan)"""
+        return self.matcher.scan(text, tokens)
+
+    def feature_ids(self, text):
+        """Return the ids of the keywords in normalized text"""
+        return self._ids(self.matcher.scan(text))
+
+    @staticmethod
+    def _ids(features):
+        ids = []
+        while features:
+            lowest = features & -features
+            ids.append(lowest.bit_length() - 1)
+            features ^= lowest
+        return ids
+
+    def scores_of(self, features):
+        """Return {intent index: score} for a bitmask of matched keywords"""
+        scores = {}
+        get = scores.get
+        rows = self.rows
+        for feature in self._ids(features):
+            for intent_index, weight in rows[feature]:
+                scores[intent_index] = get(intent_index, 0.0) + weight
+        return scores
+
+    def scores(self, text):
+        """Return {intent index: score} for every intent with a keyword in text"""
+        return self.scores_of(self.matcher.scan(text))
+
+    def _ranked(self, scores):
+        return sorted(scores, key=lambda index: (self.tiers[index], -scores[index], index))
+
+    def rank_of(self, features):
+        """Return an IntentScore for every intent a bitmask of keywords matches, best first"""
+        scores = self.scores_of(features)
+        total = sum(scores.values())
+        return [IntentScore(self.intents[index], scores[index], scores[index] / total)
+                for index in self._ranked(scores)]
+
+    def rank(self, text):
+        """Return an IntentScore for every matched intent, best first"""
+        return self.rank_of(self.matcher.scan(text))
+
+    def best_of(self, features):
+        """Return the winning intent for a bitmask of matched keywords, or None"""
+        if not features:
+            return None
+        if features & self.crisis_features and self._two_tiers:
+            # Only crisis intents can win, and only crisis keywords score them
+            features &= self.crisis_features
+            scores = self.scores_of(features)
+            tiers = self.tiers
+            scores = {index: score for index, score in scores.items() if tiers[index] == CRISIS_TIER}
+        else:
+            scores = self.scores_of(features)
+            if not self._two_tiers:
+                tiers = self.tiers
+                return self.intents[min(scores, key=lambda index: (tiers[index], -scores[index], index))]
+        # Within a tier the highest score wins, then the earliest intent
+        top = max(scores.values())
+        return self.intents[min(index for index, score in scores.items() if score == top)]
+
+    def best(self, text):
+        """Return the winning intent for normalized text, or None"""
+        return self.best_of(self.matcher.scan(text))
+
+    def matrix(self):
+        """Return the keyword x intent weights as a scipy CSR matrix"""
+        if self._matrix is None:
+            import numpy as np
+            from scipy import sparse
+            rows, cols, weights = [], [], []
+            for feature, entries in enumerate(self.rows):
+                for intent_index, weight in entries:
+                    rows.append(feature)
+                    cols.append(intent_index)
+                    weights.append(weight)
+            self._matrix = sparse.csr_matrix(
+                (np.asarray(weights, dtype=np.float64), (rows, cols)),
+                shape=(len(self.features), len(self.intents))
+            )
+        return self._matrix
+
+    def score_batch(self, texts):
+        """Return a dense messages x intents score array, or None without numpy and scipy"""
+        return self.score_features([self.matcher.scan(text) for text in texts])
+
+    def score_features(self, feature_masks):
+        """score_batch() for the keyword bitmasks of the messages"""
+        try:
+            import numpy as np
+            from scipy import sparse
+        except ImportError:
+            return None
+        indptr = [0]
+        indices = []
+        for features in feature_masks:
+            indices.extend(self._ids(features))
+            indptr.append(len(indices))
+        features = sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(len(feature_masks), len(self.features))
+        )
+        return (features @ self.matrix()).toarray()
+
+    def best_batch(self, texts):
+        """Return the winning intent (or None) of every text in one sparse product"""
+        return self.best_features([self.matcher.scan(text) for text in texts])
+
+    def best_features(self, feature_masks):
+        """best_batch() for the keyword bitmasks of the messages"""
+        scores = self.score_features(feature_masks)
+        if scores is None:
+            return [self.best_of(features) for features in feature_masks]
+        import numpy as np
+        tiers = np.asarray(self.tiers)
+        winners = np.full(len(feature_masks), -1)
+        for tier in sorted(set(self.tiers)):
+            tier_scores = np.where(tiers == tier, scores, 0.0)
+            decided = (winners < 0) & (tier_scores.max(axis=1, initial=0.0) > 0)
+            # argmax returns the first of equal scores, which is table order
+            winners[decided] = tier_scores[decided].argmax(axis=1)
+        return [self.intents[index] if index >= 0 else None for index in winners]
@@ -0,0 +1,121 @@
+"""
+Compiled keyword matching shared by the chatbot responders.
+Keywords match whole words, so "hi" no longer fires inside "this" or "die"
+inside "diet". Each keyword table is compiled once into an index from word
+(and its plural) to the categories that use it, and from the first word of
+each phrase to the phrases it starts. The words of a message are checked
+against the index in one set intersection, which runs in C; only the few
+words it returns are looked at in Python. Phrases and prefixes are
+substring tests on the message padded with spaces, and a phrase is only
+tested when all of its words are in the message.
+"""
+
+import re
+
+# Same folding as engine.cache.normalize_message: apostrophes are kept
+NON_WORD_PATTERN = re.compile(r"[^\w']+")
+
+
+def keyword_words(keyword):
+    """Return the lowercase words of a keyword phrase"""
+    return tuple(NON_WORD_PATTERN.sub(" ", keyword.lower().replace("’", "'")).split())
+
+
+class KeywordMatcher:
+    """Inverted index over an ordered {category: [keywords]} table.
+
+    Categories keep the order they were given in; that order is the priority
+    order the responders have always used when several categories match.
+    A keyword is a word or phrase matched on word boundaries; a single word
+    ending in * matches any word starting with it ("depress*"), and other
+    single words also match their plural. Messages are expected to be
+    normalized already (lowercase words separated by spaces); a message
+    that has been split already can be passed as its list of words.
+    """
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        if len(set(self.categories)) != len(self.categories):
+            raise ValueError("Duplicate category in keyword table")
+
+        words = {}
+        prefixes = {}
+        phrases = {}
+        for index, keywords in enumerate(categories.values()):
+            bit = 1 << index
+            for keyword in keywords:
+                prefix = keyword.endswith("*")
+                phrase = keyword_words(keyword.rstrip("*"))
+                if not phrase:
+                    continue
+                if len(phrase) > 1:
+                    if prefix:
+                        raise ValueError(f"Only single words can be prefixes: {keyword}")
+                    phrases[phrase] = phrases.get(phrase, 0) | bit
+                elif prefix:
+                    prefixes[phrase[0]] = prefixes.get(phrase[0], 0) | bit
+                else:
+                    words[phrase[0]] = words.get(phrase[0], 0) | bit
+
+        # A word keyword also matches its plural, so plurals go in the same index
+        word_index = dict(words)
+        for word, bits in words.items():
+            if len(word) >= 3 and word[-1] != "s":
+                word_index[word + "s"] = word_index.get(word + "s", 0) | bits
+        self._words = word_index
+
+        # Prefixes and phrases are found with substring tests on the message
+        # padded with spaces: " depress" starts a word, " lost my job " is
+        # the whole phrase
+        self._prefixes = tuple((f" {prefix}", bits) for prefix, bits in prefixes.items())
+        self._phrases = {}
+        for phrase, bits in phrases.items():
+            self._phrases.setdefault(phrase[0], []).append((f" {' '.join(phrase)} ", frozenset(phrase), bits))
+        self._phrase_words = frozenset(word for phrase in phrases for word in phrase)
+        # Every word that can start a match, for the intersection with a message
+        self._vocabulary = frozenset(self._words) | frozenset(self._phrases)
+
+    def scan(self, text, tokens=None):
+        """Return a bitmask of every category hit in text
+
+        text is a normalized message, or its list of words; tokens may pass
+        the words of a normalized text that has been split already.
+        """
+        if isinstance(text, str):
+            if tokens is None:
+                tokens = text.split()
+        else:
+            tokens, text = text, None
+        hits = 0
+        padded = present = None
+        words = self._words
+        phrases = self._phrases
+        for token in self._vocabulary.intersection(tokens):
+            hits |= words.get(token, 0)
+            candidates = phrases.get(token)
+            if candidates:
+                if padded is None:
+                    padded = f" {' '.join(tokens) if text is None else text} "
+                    present = self._phrase_words.intersection(tokens)
+                for needle, phrase_words, bits in candidates:
+                    if phrase_words <= present and needle in padded:
+                        hits |= bits
+        if self._prefixes:
+            if padded is None:
+                padded = f" {' '.join(tokens) if text is None else text} "
+            for needle, bits in self._prefixes:
+                if needle in padded:
+                    hits |= bits
+        return hits
+
+    def find_all(self, text):
+        """Return every matching category, highest priority first"""
+        hits = self.scan(text)
+        return [category for index, category in enumerate(self.categories) if hits >> index & 1]
+
+    def first(self, text):
+        """Return the highest priority matching category, or None"""
+        hits = self.scan(text)
+        if not hits:
+            return None
+        return self.categories[(hits & -hits).bit_length() - 1]
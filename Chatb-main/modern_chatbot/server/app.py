@@ -1,43 +1,42 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-import json
-from datetime import datetime
-import random
+
+from chat_api import (METRICS_CONTENT_TYPE, chat_events, chat_reply_body, metrics_body,
+                      profile_capture, profile_headers, request_error)
 
 app = Flask(__name__)
 CORS(app)
 
-# Load responses from a JSON file
-def load_responses():
-    try:
-        with open('responses.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {
-            "greeting": ["Hello! How can I help you today?", "Hi there! What can I do for you?", "Welcome! How may I assist you?"],
-            "help": ["I'm here to help. What do you need?", "How can I assist you today?", "What can I help you with?"],
-            "default": ["I understand. Could you tell me more?", "That's interesting. Please continue.", "I'm listening. What else would you like to share?"]
-        }
+def request_capture():
+    return profile_capture(request.headers.get, request.args.get)
 
-responses = load_responses()
+def request_data():
+    return request.get_json(silent=True)
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
-    data = request.json
-    user_message = data.get('message', '').lower()
-    
-    # Simple response logic
-    if any(word in user_message for word in ['hi', 'hello', 'hey']):
-        response = random.choice(responses['greeting'])
-    elif any(word in user_message for word in ['help', 'assist', 'support']):
-        response = random.choice(responses['help'])
-    else:
-        response = random.choice(responses['default'])
-    
-    return jsonify({
-        'message': response,
-        'timestamp': datetime.now().isoformat()
-    })
+    data = request_data()
+    error = request_error(data)
+    if error is not None:
+        return jsonify(error=error), 400
+    with request_capture() as capture:
+        body = chat_reply_body(data)
+    return Response(body, mimetype='application/json', headers=profile_headers(capture))
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    data = request_data()
+    error = request_error(data)
+    if error is not None:
+        return jsonify(error=error), 400
+    capture = request_capture()
+    return Response(capture.wrap(chat_events(data)),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', **profile_headers(capture)})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(metrics_body(), content_type=METRICS_CONTENT_TYPE)
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000) 
\ No newline at end of file
+    app.run(debug=True, port=5000)
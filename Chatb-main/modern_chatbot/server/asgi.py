@@ -0,0 +1,183 @@
+"""
+Asyncio ASGI server for the /api/chat contract.
+
+    python asgi.py --workers 4 --keep-alive 30
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker --workers 4 --preload
+
+Same endpoints as the Flask server: POST {"message": ...} to /api/chat and
+get back {"message": ..., "timestamp": ...}, or to /api/chat/stream for the
+reply as Server-Sent Events, and GET /metrics for Prometheus. Requests
+carrying PROFILE_TOKEN are profiled like on the Flask server. CORS is open for the React client. The
+response engine is loaded when this module is imported, so each worker (or
+the gunicorn master, with --preload) compiles its tables once, before it
+accepts connections. Connections are kept alive between requests for
+--keep-alive seconds.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from urllib.parse import parse_qs
+
+from chat_api import (METRICS_CONTENT_TYPE, chat_events, chat_reply_body, metrics_body,
+                      profile_capture, profile_headers, request_error)
+
+CHAT_PATHS = ("/api/chat", "/api/chat/stream")
+
+CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-methods", b"POST, OPTIONS"),
+    (b"access-control-allow-headers", b"Content-Type, X-Profile, X-Profile-Seconds"),
+    (b"access-control-expose-headers", b"X-Profile-Output")
+]
+
+
+def encode_headers(headers):
+    return [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+
+
+async def send_body(send, status, payload, content_type=b"application/json", headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type),
+                    (b"content-length", str(len(payload)).encode())] + CORS_HEADERS + list(headers)
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def send_json(send, status, body):
+    await send_body(send, status, json.dumps(body).encode('utf-8'))
+
+
+async def send_events(send, receive, events, headers=()):
+    """Stream encoded Server-Sent Events
+
+    The events are pulled on the default executor, so a slow generator
+    behind the engine does not block other connections. If the client
+    disconnects mid-stream, no more events are pulled and the generator is
+    closed, which finishes its turn timer.
+    """
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache")] + CORS_HEADERS + list(headers)
+    })
+    loop = asyncio.get_running_loop()
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    pull = None
+    try:
+        while True:
+            pull = loop.run_in_executor(None, next, events, None)
+            await asyncio.wait((pull, disconnected), return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                return
+            item = pull.result()
+            if item is None:
+                break
+            await send({"type": "http.response.body", "body": item, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        disconnected.cancel()
+        # A generator cannot be closed while next() is running on it
+        if pull is None or pull.done():
+            events.close()
+        else:
+            pull.add_done_callback(lambda _: events.close())
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    if scope["path"] == "/metrics" and scope["method"] == "GET":
+        await send_body(send, 200, metrics_body(), METRICS_CONTENT_TYPE.encode())
+        return
+    if scope["path"] not in CHAT_PATHS:
+        await send_json(send, 404, {"error": "Not found"})
+        return
+    if scope["method"] == "OPTIONS":
+        await send({"type": "http.response.start", "status": 204, "headers": CORS_HEADERS})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    if scope["method"] != "POST":
+        await send_json(send, 405, {"error": "Method not allowed"})
+        return
+
+    body = await read_body(receive)
+    if body is None:
+        return
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        data = None
+    error = request_error(data)
+    if error is not None:
+        await send_json(send, 400, {"error": error})
+        return
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope["headers"]}
+    query = {name: values[0] for name, values in parse_qs(scope.get("query_string", b"").decode('latin-1')).items()}
+    capture = profile_capture(lambda name: headers.get(name.lower()), query.get)
+    if scope["path"] == "/api/chat/stream":
+        await send_events(send, receive, capture.wrap(chat_events(data)),
+                          encode_headers(profile_headers(capture)))
+    else:
+        with capture:
+            body = chat_reply_body(data)
+        await send_body(send, 200, body, headers=encode_headers(profile_headers(capture)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve /api/chat over ASGI")
+    parser.add_argument("--host", default=os.getenv("CHAT_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CHAT_PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CHAT_WORKERS", "1")),
+                        help="worker processes")
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("CHAT_KEEP_ALIVE", "30")),
+                        help="seconds an idle connection is kept open")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run(
+        "asgi:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=args.keep_alive
+    )
+
+
+if __name__ == "__main__":
+    main()
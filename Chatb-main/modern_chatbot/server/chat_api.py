@@ -0,0 +1,126 @@
+"""
+The /api/chat contract shared by the Flask and ASGI servers.
+/api/chat answers with one JSON body; /api/chat/stream sends the reply as
+Server-Sent Events: a "chunk" event per piece of text, then a "done" event
+carrying the same body /api/chat would have returned.
+Bodies that are not a JSON object with a string "message" are answered
+with 400 and an "error" body (see request_error) before any engine work.
+/metrics exports the engine's turn latency histograms for Prometheus.
+Either chat endpoint is profiled when the request presents PROFILE_TOKEN in
+an X-Profile header or a profile query parameter (see engine.profiling).
+Importing this module registers the API's rule table with the response
+engine, so every worker has its tables compiled before the first request.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+# Make the shared chatbot modules importable from the server directory
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from engine import METRICS, NO_TIMER, PROFILER, KeywordRules, register_rules, respond, respond_stream
+
+# Load responses from a JSON file
+def load_responses():
+    try:
+        with open('responses.json', 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {
+            "greeting": ["Hello! How can I help you today?", "Hi there! What can I do for you?", "Welcome! How may I assist you?"],
+            "help": ["I'm here to help. What do you need?", "How can I assist you today?", "What can I help you with?"],
+            "default": ["I understand. Could you tell me more?", "That's interesting. Please continue.", "I'm listening. What else would you like to share?"]
+        }
+
+responses = load_responses()
+
+# Keywords for each response category, checked in priority order
+KEYWORDS = {
+    "greeting": ['hi', 'hello', 'hey'],
+    "help": ['help', 'assist', 'support']
+}
+
+# Register the API's table with the shared response engine
+register_rules(KeywordRules("api", KEYWORDS, responses, responses['default']))
+
+def request_error(data):
+    """Return why a decoded request body is not a chat request, or None"""
+    if not isinstance(data, dict):
+        return "Expected a JSON object"
+    if not isinstance(data.get('message', ''), str):
+        return "Expected \"message\" to be a string"
+    return None
+
+def chat_reply(data, timer=NO_TIMER):
+    """Answer a decoded /api/chat request body"""
+    user_message = data.get('message', '')
+    response = respond(user_message, {"rules": "api", "timer": timer})
+    return {
+        'message': response.text,
+        'timestamp': datetime.now().isoformat()
+    }
+
+def chat_reply_body(data):
+    """Answer a decoded /api/chat request body with the encoded JSON reply"""
+    timer = METRICS.timer("api")
+    body = json.dumps(chat_reply(data, timer)).encode('utf-8')
+    timer.mark("serialize")
+    timer.finish()
+    return body
+
+def profile_capture(header, query):
+    """Return the profiling capture for a request
+
+    header and query look up a request header or query parameter by name.
+    """
+    return PROFILER.capture(
+        "api",
+        header("X-Profile") or query("profile"),
+        header("X-Profile-Seconds") or query("profile_seconds")
+    )
+
+def profile_headers(capture):
+    """Response headers naming the file a capture writes to"""
+    if capture.path is None:
+        return {}
+    return {'X-Profile-Output': os.path.basename(capture.path)}
+
+def metrics_body():
+    """Return the /metrics page"""
+    return METRICS.render().encode('utf-8')
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def chat_events(data):
+    """Yield the encoded Server-Sent Events of a streamed /api/chat reply
+
+    The turn is timed like /api/chat, as the api_stream endpoint: each
+    chunk adds a "serialize" stage for encoding it and a "send" stage for
+    the wait until the server asks for the next one. A stream closed early,
+    when the client disconnects, still finishes its timer.
+    """
+    timer = METRICS.timer("api_stream")
+    user_message = data.get('message', '')
+    chunks = []
+    try:
+        for chunk in respond_stream(user_message, {"rules": "api", "timer": timer}):
+            chunks.append(chunk)
+            event = sse_event('chunk', {'delta': chunk})
+            timer.mark("serialize")
+            yield event
+            timer.mark("send")
+        event = sse_event('done', {
+            'message': ''.join(chunks),
+            'timestamp': datetime.now().isoformat()
+        })
+        timer.mark("serialize")
+    finally:
+        timer.finish()
+    yield event
+
+def sse_event(event, payload):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode('utf-8')
@@ -3,6 +3,8 @@ import { motion } from 'framer-motion';
 import axios from 'axios';
 import './App.css';
 
+const API_URL = 'http://localhost:5000';
+
 interface Message {
   id: number;
   text: string;
@@ -25,6 +27,46 @@ const App: React.FC = () => {
     scrollToBottom();
   }, [messages]);
 
+  // Read a Server-Sent Events reply, calling onChunk with each piece of text.
+  // A stream that ends with no text, or before its "done" event, is an error.
+  const streamChat = async (text: string, onChunk: (delta: string) => void) => {
+    const response = await fetch(`${API_URL}/api/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ message: text }),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Stream request failed: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let chunks = 0;
+    let finished = false;
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop() ?? '';
+      for (const event of events) {
+        const lines = event.split('\n');
+        const name = lines.find((line) => line.startsWith('event: '))?.slice(7);
+        const data = lines.find((line) => line.startsWith('data: '))?.slice(6);
+        if (name === 'chunk' && data) {
+          chunks += 1;
+          onChunk(JSON.parse(data).delta);
+        } else if (name === 'done') {
+          finished = true;
+        }
+      }
+    }
+    if (chunks === 0 || !finished) {
+      throw new Error(chunks === 0 ? 'Reply stream was empty' : 'Reply stream ended early');
+    }
+  };
+
   const handleSend = async () => {
     if (!input.trim()) return;
 
@@ -34,26 +76,49 @@ const App: React.FC = () => {
       sender: 'user',
       timestamp: new Date().toLocaleTimeString(),
     };
+    const botId = userMessage.id + 1;
 
     setMessages((prev) => [...prev, userMessage]);
     setInput('');
     setIsLoading(true);
 
-    try {
-      const response = await axios.post('http://localhost:5000/api/chat', {
-        message: input,
+    // Show the reply as it streams in; the first chunk replaces the loader.
+    // With replace, the bot message's text is swapped out instead of extended.
+    const updateReply = (text: string, replace: boolean) => {
+      setIsLoading(false);
+      setMessages((prev) => {
+        if (prev.some((message) => message.id === botId)) {
+          return prev.map((message) =>
+            message.id === botId ? { ...message, text: replace ? text : message.text + text } : message
+          );
+        }
+        return [
+          ...prev,
+          { id: botId, text, sender: 'bot', timestamp: new Date().toLocaleTimeString() },
+        ];
       });
+    };
 
-      const botMessage: Message = {
-        id: Date.now() + 1,
-        text: response.data.message,
-        sender: 'bot',
-        timestamp: new Date().toLocaleTimeString(),
-      };
-
-      setMessages((prev) => [...prev, botMessage]);
-    } catch (error) {
-      console.error('Error sending message:', error);
+    let receivedChunk = false;
+    try {
+      await streamChat(input, (delta) => {
+        receivedChunk = true;
+        updateReply(delta, false);
+      });
+    } catch (streamError) {
+      // Fall back to the single-response endpoint. Its reply is a whole new
+      // answer, so it replaces whatever part of the stream already arrived.
+      if (receivedChunk) {
+        console.warn('Reply stream was interrupted, fetching the whole reply:', streamError);
+      }
+      try {
+        const response = await axios.post(`${API_URL}/api/chat`, {
+          message: input,
+        });
+        updateReply(response.data.message, true);
+      } catch (error) {
+        console.error('Error sending message:', error);
+      }
     } finally {
       setIsLoading(false);
     }
@@ -0,0 +1,160 @@
+"""
+bcrypt hashing and verification on a bounded worker pool.
+Each bcrypt call costs hundreds of milliseconds of CPU at the default work
+factor. Running them on a fixed number of threads (bcrypt releases the GIL)
+caps how much CPU logins can take from chat turns, and a limit on queued
+requests turns a burst into a quick "busy" answer instead of a pile-up.
+A request keeps its slot until its bcrypt job has finished, even if the
+caller gave up waiting on it, so timed-out jobs still count against the
+limit. Passwords hashed with another work factor are rehashed on the next
+login. metric_lines() exports the call counts and latencies in the
+Prometheus text format.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+
+
+class AuthBusy(RuntimeError):
+    """Raised when too many hashing requests are already waiting"""
+
+
+class AuthTimeout(AuthBusy):
+    """Raised when a hashing request did not finish within the timeout"""
+
+
+def hash_rounds(password_hash):
+    """Return the work factor of a bcrypt hash such as $2b$12$..."""
+    return int(password_hash.split('$')[2])
+
+
+class PasswordHasher:
+    """Runs bcrypt on workers threads with at most queue_limit requests waiting"""
+
+    def __init__(self, workers=2, queue_limit=16, rounds=DEFAULT_ROUNDS, timeout=30.0):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.calls = 0
+        self.seconds = 0.0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise AuthBusy("Too many sign-in requests are waiting")
+        start = time.perf_counter()
+
+        def finished(future):
+            # The slot is freed when the job ends, not when the caller stops waiting
+            self._slots.release()
+            with self._lock:
+                latency = time.perf_counter() - start
+                self.calls += 1
+                self.seconds += latency
+                self._latencies.append(latency)
+
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(finished)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise AuthTimeout(f"Password check took longer than {self.timeout:g}s") from None
+
+    def _hash(self, password):
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)).decode()
+
+    def _verify(self, password, password_hash):
+        if not bcrypt.checkpw(password.encode(), password_hash.encode()):
+            return False, None
+        if hash_rounds(password_hash) != self.rounds:
+            return True, self._hash(password)
+        return True, None
+
+    def hash(self, password):
+        """Return a bcrypt hash of password at the configured work factor"""
+        return self._run(self._hash, password)
+
+    def verify(self, password, password_hash):
+        """Check password; returns (matches, new hash to store or None)
+
+        A new hash is returned when the stored one used a different work
+        factor, so the caller can save it.
+        """
+        return self._run(self._verify, password, password_hash)
+
+    def stats(self):
+        """Call counts, total latency and latency of recent calls
+
+        Latencies are in seconds and include queueing. seconds_total and
+        calls cover every finished call, the rest only the recent ones.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            calls, seconds, rejected, timeouts = self.calls, self.seconds, self.rejected, self.timeouts
+        if not latencies:
+            return {"calls": calls, "seconds_total": seconds, "rejected": rejected, "timeouts": timeouts}
+        return {
+            "calls": calls,
+            "seconds_total": seconds,
+            "rejected": rejected,
+            "timeouts": timeouts,
+            "mean_s": sum(latencies) / len(latencies),
+            "p50_s": latencies[len(latencies) // 2],
+            "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "max_s": latencies[-1]
+        }
+
+    def metric_lines(self):
+        """Return stats() in the Prometheus text format, for Metrics.add_collector"""
+        stats = self.stats()
+        lines = []
+        for name, help_text in (("calls", "Finished bcrypt calls."),
+                                ("rejected", "Hashing requests refused because the queue was full."),
+                                ("timeouts", "Hashing requests that timed out while waiting.")):
+            lines += [
+                f"# HELP auth_hash_{name}_total {help_text}",
+                f"# TYPE auth_hash_{name}_total counter",
+                f"auth_hash_{name}_total {stats[name]}"
+            ]
+        # Quantiles cover the recent calls, _sum and _count every finished call
+        lines += [
+            "# HELP auth_hash_seconds Latency of bcrypt calls, including queueing.",
+            "# TYPE auth_hash_seconds summary"
+        ]
+        if "p50_s" in stats:
+            for quantile, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("1", "max_s")):
+                lines.append(f'auth_hash_seconds{{quantile="{quantile}"}} {stats[key]}')
+        lines += [
+            f"auth_hash_seconds_sum {stats['seconds_total']}",
+            f"auth_hash_seconds_count {stats['calls']}"
+        ]
+        return lines
+
+
+def hasher_from_env():
+    """Build a PasswordHasher from AUTH_WORKERS, AUTH_QUEUE_LIMIT and BCRYPT_ROUNDS"""
+    return PasswordHasher(
+        int(os.getenv("AUTH_WORKERS", "2")),
+        int(os.getenv("AUTH_QUEUE_LIMIT", "16")),
+        int(os.getenv("BCRYPT_ROUNDS", str(DEFAULT_ROUNDS)))
+    )
@@ -0,0 +1,45 @@
+# Response tables for the professional chat assistant, compiled by the engine
+
+# Professional and friendly response templates
+RESPONSES = {
+    "greeting": [
+        "Hello! I'm here to help. How can I assist you today?",
+        "Hi there! I'm ready to chat. What's on your mind?",
+        "Welcome! I'm here to support you. How can I help?"
+    ],
+    "general_help": [
+        "I'd be happy to help with that. Could you tell me more about what you're looking for?",
+        "I understand you need assistance. Let me help you with that.",
+        "I'm here to support you. What specific information would you like?"
+    ],
+    "mental_health": [
+        "I'm here to listen and support you. Would you like to share more about how you're feeling?",
+        "Your feelings are important. I'm here to help you process them.",
+        "It's okay to feel this way. Let's talk about what's on your mind."
+    ],
+    "professional": [
+        "Based on your query, I can provide some professional insights.",
+        "From a professional perspective, here's what I can suggest.",
+        "Let me offer some professional guidance on this matter."
+    ],
+    "friendly": [
+        "I'm glad you reached out! Let's work through this together.",
+        "You're not alone in this. I'm here to help you figure things out.",
+        "I appreciate you sharing this with me. Let's find a solution together."
+    ],
+    "closing": [
+        "Is there anything else you'd like to discuss?",
+        "I'm here if you need anything else.",
+        "Feel free to ask if you have more questions."
+    ]
+}
+
+# Keywords for each response category, checked in priority order
+# Keywords match whole words (and plurals); a trailing * matches any word
+# starting with the keyword
+KEYWORDS = {
+    "greeting": ["hi", "hello", "hey"],
+    "general_help": ["help", "assist*", "support*"],
+    "mental_health": ["feel*", "anxious", "stress*", "worried"],
+    "professional": ["professional", "expert", "advice"]
+}
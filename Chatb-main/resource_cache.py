@@ -0,0 +1,43 @@
+"""
+Process-wide caching of loaded data files.
+Streamlit apps pass file_version() into st.cache_resource functions, so an
+edited file becomes a new cache key and is reloaded without a restart.
+Processes without Streamlit can wrap their loaders with cached_on_files.
+"""
+
+import functools
+import os
+import threading
+
+
+def file_version(*paths):
+    """Return a hashable (mtime, size) stamp for each path; None if missing"""
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            version.append(None)
+        else:
+            version.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def cached_on_files(*paths):
+    """Cache a zero-argument loader until any of paths changes on disk"""
+    def decorator(loader):
+        lock = threading.Lock()
+        cache = {}
+
+        @functools.wraps(loader)
+        def load():
+            version = file_version(*paths)
+            with lock:
+                if cache.get('version') != version or 'value' not in cache:
+                    cache['value'] = loader()
+                    cache['version'] = version
+                return cache['value']
+
+        load.cache_clear = cache.clear
+        return load
+    return decorator
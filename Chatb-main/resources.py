@@ -86,4 +86,10 @@ WARNING_SIGNS = [
     "Mood swings that cause problems in relationships",
     "Increased use of substances to cope",
     "Significant changes in behavior or personality"
-] 
\ No newline at end of file
+] 
+
+# Replies of the shared crisis category every keyword rule table has
+CRISIS_RESPONSES = [
+    "I'm really concerned about what you're sharing, and I'm glad you told me. You don't have to go through this alone. If you might act on these thoughts, please call or text 988 (Suicide & Crisis Lifeline, US) or your local emergency number now; crisis lines in other countries are listed at https://www.iasp.info/resources/Crisis_Centres/. Would you like to tell me what's been happening?",
+    "Thank you for trusting me with this. What you're feeling matters, and so do you. Please reach out to someone who can help right now: call or text 988 in the US, call your local emergency number, or find a crisis line near you at https://www.iasp.info/resources/Crisis_Centres/. I'm here to keep talking with you too."
+]
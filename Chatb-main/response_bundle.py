@@ -0,0 +1,178 @@
+"""
+Compact binary bundle of the trained chatbot data.
+train_chatbot.py writes it next to the JSON file. The app memory-maps it, so
+loading costs the same no matter how many examples there are: strings are
+interned and only decoded when used, and type/issue buckets are stored
+prebuilt as integer arrays.
+
+Layout (native-endian unsigned 32-bit integers unless noted):
+    magic (8 bytes), string_count, example_count, type_count, issue_count
+    string_offsets[string_count + 1]
+    example_inputs[example_count], example_responses[example_count]
+    example_types[example_count], example_issues[example_count]
+    type_names[type_count], type_offsets[type_count + 1], type_ids[...]
+    issue_names[issue_count], issue_offsets[issue_count + 1], issue_ids[...]
+    UTF-8 string data
+"""
+
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+
+from resource_cache import file_version
+from training_index import TrainingIndex, load_training_index
+
+MAGIC = b"CHBNDL" + (b"LE" if sys.byteorder == "little" else b"BE")
+NO_ISSUE = 0xFFFFFFFF
+
+
+class StringTable:
+    """Read-only sequence of strings decoded lazily from the bundle"""
+
+    def __init__(self, offsets, data, string_ids=None):
+        self._offsets = offsets
+        self._data = data
+        self._string_ids = string_ids
+
+    def __len__(self):
+        if self._string_ids is None:
+            return len(self._offsets) - 1
+        return len(self._string_ids)
+
+    def __getitem__(self, index):
+        if self._string_ids is not None:
+            index = self._string_ids[index]
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def subset(self, string_ids):
+        """Return a view of the strings with the given ids"""
+        return StringTable(self._offsets, self._data, string_ids)
+
+
+def _buckets(codes):
+    """Group example ids by code; returns (codes, offsets, ids)"""
+    groups = {}
+    for example_id, code in enumerate(codes):
+        if code is not None:
+            groups.setdefault(code, []).append(example_id)
+    offsets = [0]
+    ids = []
+    for bucket in groups.values():
+        ids.extend(bucket)
+        offsets.append(len(ids))
+    return list(groups), offsets, ids
+
+
+def write_bundle(training_data, filename="trained_chatbot_data.bin"):
+    """Write training data to a binary bundle
+
+    The bundle is written to a temporary file and renamed over filename, so
+    processes that have the old bundle mapped keep reading the old file.
+    """
+    strings = {}
+
+    def intern(text):
+        return strings.setdefault(text, len(strings))
+
+    inputs = [intern(item['input']) for item in training_data]
+    responses = [intern(item['response']) for item in training_data]
+    types = [intern(item['type']) for item in training_data]
+    issues = [intern(item['issue']) if item.get('issue') is not None else None for item in training_data]
+
+    type_names, type_offsets, type_ids = _buckets(types)
+    issue_names, issue_offsets, issue_ids = _buckets(issues)
+
+    encoded = [text.encode('utf-8') for text in strings]
+    string_offsets = [0]
+    for data in encoded:
+        string_offsets.append(string_offsets[-1] + len(data))
+
+    sections = [
+        [len(strings), len(training_data), len(type_names), len(issue_names)],
+        string_offsets,
+        inputs, responses, types,
+        [NO_ISSUE if code is None else code for code in issues],
+        type_names, type_offsets, type_ids,
+        issue_names, issue_offsets, issue_ids
+    ]
+    fd, temporary_path = tempfile.mkstemp(prefix=os.path.basename(filename) + ".",
+                                          dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            for section in sections:
+                f.write(array('I', section).tobytes())
+            f.write(b"".join(encoded))
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, filename)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+class ResponseBundle(TrainingIndex):
+    """TrainingIndex backed by a memory-mapped binary bundle"""
+
+    def __init__(self, filename="trained_chatbot_data.bin"):
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{filename} is not a response bundle for this platform")
+        words = view[len(MAGIC):len(MAGIC) + (len(view) - len(MAGIC)) // 4 * 4].cast('I')
+        position = 0
+
+        def take(count):
+            nonlocal position
+            section = words[position:position + count]
+            if len(section) != count:
+                raise ValueError(f"{filename} is truncated")
+            position += count
+            return section
+
+        string_count, example_count, type_count, issue_count = take(4)
+        string_offsets = take(string_count + 1)
+        example_inputs = take(example_count)
+        example_responses = take(example_count)
+        self.example_types = take(example_count)
+        self.example_issues = take(example_count)
+        type_names = take(type_count)
+        type_offsets = take(type_count + 1)
+        type_ids = take(type_offsets[-1])
+        issue_names = take(issue_count)
+        issue_offsets = take(issue_count + 1)
+        issue_ids = take(issue_offsets[-1])
+
+        string_data = view[len(MAGIC) + position * 4:]
+        if string_offsets[-1] > len(string_data):
+            raise ValueError(f"{filename} is truncated")
+        self.strings = StringTable(string_offsets, string_data)
+        self.inputs = self.strings.subset(example_inputs)
+        self.responses = self.strings.subset(example_responses)
+        self.by_type = {
+            self.strings[name]: type_ids[type_offsets[code]:type_offsets[code + 1]]
+            for code, name in enumerate(type_names)
+        }
+        self.by_issue = {
+            self.strings[name]: issue_ids[issue_offsets[code]:issue_offsets[code + 1]]
+            for code, name in enumerate(issue_names)
+        }
+        self.size = example_count
+
+
+def load_bundle(filename="trained_chatbot_data.bin"):
+    """Memory-map a response bundle written by write_bundle"""
+    return ResponseBundle(filename)
+
+
+def load_training(json_filename="trained_chatbot_data.json", bundle_filename="trained_chatbot_data.bin"):
+    """Load the bundle when it is at least as new as the JSON and intact, else the JSON"""
+    json_version, bundle_version = file_version(json_filename, bundle_filename)
+    if bundle_version is not None and (json_version is None or bundle_version[0] >= json_version[0]):
+        try:
+            return load_bundle(bundle_filename)
+        except (ValueError, IndexError):
+            pass
+    return load_training_index(json_filename)
@@ -0,0 +1,130 @@
+"""
+BM25 retrieval over the inputs of the trained chatbot data.
+The inverted index is a sparse document x term matrix of precomputed BM25
+weights, so scoring a message is one sparse product instead of a Python loop.
+"""
+
+import random
+import re
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Sparse BM25 weights for a fixed list of documents"""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.vocabulary = {}
+        rows, cols, counts = [], [], []
+        lengths = np.zeros(len(documents))
+        for doc_id, document in enumerate(documents):
+            term_counts = {}
+            tokens = tokenize(document)
+            for token in tokens:
+                term_id = self.vocabulary.setdefault(token, len(self.vocabulary))
+                term_counts[term_id] = term_counts.get(term_id, 0) + 1
+            lengths[doc_id] = len(tokens)
+            rows.extend([doc_id] * len(term_counts))
+            cols.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+
+        self.size = len(documents)
+        weights = sparse.csc_matrix(
+            (np.asarray(counts, dtype=np.float64), (rows, cols)),
+            shape=(self.size, len(self.vocabulary))
+        )
+
+        # Column i of a CSC matrix holds the documents containing term i
+        doc_freq = np.diff(weights.indptr)
+        idf = np.log1p((self.size - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_length = lengths.mean() if self.size else 0.0
+        length_norm = k1 * (1 - b + b * lengths / avg_length) if avg_length else np.full(self.size, k1)
+        tf = weights.data
+        weights.data = np.repeat(idf, doc_freq) * tf * (k1 + 1) / (tf + length_norm[weights.indices])
+        self.weights = weights
+
+    def query_vector(self, text):
+        """Return (term ids, counts) for the known terms of text"""
+        term_ids = [self.vocabulary[token] for token in tokenize(text) if token in self.vocabulary]
+        return np.unique(term_ids, return_counts=True)
+
+    def scores(self, text):
+        """Return the BM25 score of every document for text"""
+        term_ids, counts = self.query_vector(text)
+        if not len(term_ids):
+            return np.zeros(self.size)
+        return self.weights[:, term_ids] @ counts.astype(np.float64)
+
+    def top_k(self, text, k=5):
+        """Return up to k (doc id, score) pairs with a positive score, best first"""
+        scores = self.scores(text)
+        k = min(k, self.size)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top if scores[doc_id] > 0]
+
+    def query_matrix(self, texts):
+        """Return a sparse texts x terms matrix of query term counts"""
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                term_id = self.vocabulary.get(token)
+                if term_id is not None:
+                    rows.append(row)
+                    cols.append(term_id)
+        return sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(texts), len(self.vocabulary))
+        )
+
+    def top_k_batch(self, texts, k=5):
+        """Return top_k() for every text, scored with one sparse product"""
+        scores = (self.query_matrix(texts) @ self.weights.T).tocsr()
+        results = []
+        for row in range(len(texts)):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            doc_ids = scores.indices[start:end]
+            row_scores = scores.data[start:end]
+            top = np.argsort(-row_scores, kind='stable')[:k]
+            results.append([(int(doc_ids[i]), float(row_scores[i])) for i in top if row_scores[i] > 0])
+        return results
+
+
+class TrainingRetriever:
+    """Answers messages with the responses of the nearest training examples"""
+
+    def __init__(self, training_index, top_k=5, threshold=5.0):
+        self.training_index = training_index
+        self.index = BM25Index(training_index.inputs)
+        self.top_k = top_k
+        self.threshold = threshold
+
+    def search(self, message):
+        """Return the top-k (example id, score) pairs at or above the threshold"""
+        return [(example_id, score) for example_id, score in self.index.top_k(message, self.top_k)
+                if score >= self.threshold]
+
+    def search_batch(self, messages):
+        """Return search() for every message, scored together"""
+        return [[(example_id, score) for example_id, score in hits if score >= self.threshold]
+                for hits in self.index.top_k_batch(messages, self.top_k)]
+
+    def choose(self, hits):
+        """Return the response of one of the given hits, or None"""
+        if not hits:
+            return None
+        return self.training_index.responses[random.choice(hits)[0]]
+
+    def respond(self, message):
+        """Return a response from one of the nearest examples, or None"""
+        return self.choose(self.search(message))
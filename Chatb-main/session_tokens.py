@@ -0,0 +1,153 @@
+"""
+Signed session tokens for the Sunshine portal.
+A token is the username, an expiry time and a random id, signed with HMAC
+SHA-256 under a server secret: SESSION_SECRET, or a random secret generated
+into config/session_secret.txt on first run. Checking one is a hash and a
+set lookup, so a returning user skips the bcrypt login. Revoked token ids
+are kept in memory and appended to a small denylist file; every process
+reloads that file when it changes, and expired entries are dropped.
+
+    token = tokens.issue("admin")
+    tokens.verify(token)   # "admin", or None if forged, expired or revoked
+    tokens.revoke(token)
+
+The secret must never come from the repository; anyone who knows it can sign
+a token for any user. Changing it signs everyone out.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+
+from resource_cache import file_version
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DENYLIST_PATH = os.path.join(BASE_DIR, 'HeroPage', 'config', 'revoked_tokens.txt')
+DEFAULT_SECRET_PATH = os.path.join(BASE_DIR, 'HeroPage', 'config', 'session_secret.txt')
+MIN_SECRET_LENGTH = 32
+# Keys that have been published with the portal and so sign nothing
+PUBLIC_KEYS = frozenset({"sunshine_auth"})
+
+
+def _encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+
+def _decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def load_secret(path=DEFAULT_SECRET_PATH):
+    """Return SESSION_SECRET, or the secret kept in path, generating it on first use"""
+    secret = os.getenv("SESSION_SECRET")
+    if secret:
+        return secret
+    try:
+        with open(path, 'r') as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        pass
+    # Write the new secret privately, then link it into place: link fails if
+    # another process got there first, and nobody ever reads a partial file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    fd = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as file:
+        file.write(secrets.token_urlsafe(48) + "\n")
+    try:
+        os.link(temporary_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(temporary_path)
+    with open(path, 'r') as file:
+        return file.read().strip()
+
+
+class SessionTokens:
+    """Issues, checks and revokes signed session tokens"""
+
+    def __init__(self, key, ttl_days=30, denylist_path=DEFAULT_DENYLIST_PATH):
+        if not key or key in PUBLIC_KEYS or len(key) < MIN_SECRET_LENGTH:
+            raise ValueError(
+                f"Session tokens need a private secret of at least {MIN_SECRET_LENGTH} characters; "
+                "set SESSION_SECRET or delete it to generate one"
+            )
+        self._key = key.encode('utf-8')
+        self.ttl = ttl_days * 86400
+        self.denylist_path = denylist_path
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._denylist_version = None
+
+    def _sign(self, payload):
+        return _encode(hmac.new(self._key, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def issue(self, username):
+        """Return a new token for username"""
+        payload = f"{_encode(username.encode('utf-8'))}.{int(time.time()) + self.ttl}.{secrets.token_urlsafe(12)}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def _parse(self, token):
+        """Return (username, expiry, token id) of a correctly signed token, or None"""
+        try:
+            user_part, expiry, token_id, signature = token.split(".")
+            payload = f"{user_part}.{expiry}.{token_id}"
+            if not hmac.compare_digest(signature, self._sign(payload)):
+                return None
+            return _decode(user_part).decode('utf-8'), int(expiry), token_id
+        except (AttributeError, ValueError):
+            return None
+
+    def verify(self, token):
+        """Return the username of a valid, unexpired, unrevoked token, or None"""
+        parsed = self._parse(token)
+        if parsed is None:
+            return None
+        username, expiry, token_id = parsed
+        if expiry <= time.time() or token_id in self._load_denylist():
+            return None
+        return username
+
+    def revoke(self, token):
+        """Deny token from now until it would have expired"""
+        parsed = self._parse(token)
+        if parsed is None:
+            return
+        _, expiry, token_id = parsed
+        with self._lock:
+            self._revoked[token_id] = expiry
+            with open(self.denylist_path, 'a') as file:
+                file.write(f"{token_id} {expiry}\n")
+
+    def _load_denylist(self):
+        version = file_version(self.denylist_path)
+        if version == self._denylist_version:
+            return self._revoked
+        with self._lock:
+            now = time.time()
+            revoked = {}
+            try:
+                with open(self.denylist_path, 'r') as file:
+                    for line in file:
+                        token_id, _, expiry = line.partition(" ")
+                        if expiry.strip() and int(expiry) > now:
+                            revoked[token_id] = int(expiry)
+            except FileNotFoundError:
+                pass
+            self._revoked = revoked
+            self._denylist_version = version
+            return revoked
+
+    def prune(self):
+        """Rewrite the denylist file without expired entries"""
+        revoked = self._load_denylist()
+        with self._lock:
+            temporary_path = self.denylist_path + ".tmp"
+            with open(temporary_path, 'w') as file:
+                file.writelines(f"{token_id} {expiry}\n" for token_id, expiry in revoked.items())
+            os.replace(temporary_path, self.denylist_path)
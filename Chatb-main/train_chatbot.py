@@ -2,19 +2,13 @@ import os
 import json
 from datetime import datetime
 import random
+from response_bundle import write_bundle
 from resources import (
     CRISIS_RESOURCES,
     COPING_STRATEGIES,
     SELF_CARE_REMINDERS,
     WARNING_SIGNS
 )
-from app import (
-    check_for_crisis_keywords,
-    detect_issue,
-    detect_conversation_type,
-    extract_name,
-    extract_emotions
-)
 
 # Advanced conversation templates
 CONVERSATION_STARTERS = {
@@ -177,6 +171,11 @@ def save_training_data(training_data, filename="trained_chatbot_data.json"):
             "version": "1.0"
         }, f, indent=2, ensure_ascii=False)
     print(f"Training data saved to {filename}")
+    
+    # Also emit the binary bundle the app memory-maps at startup
+    bundle_filename = os.path.splitext(filename)[0] + ".bin"
+    write_bundle(training_data, bundle_filename)
+    print(f"Response bundle saved to {bundle_filename}")
 
 def main():
     """Main function to create and save training data"""
@@ -0,0 +1,43 @@
+"""
+Bucketed view of the trained chatbot data.
+Responses are grouped by type and by issue once at load time, so picking a
+response for a turn is a single random choice instead of a scan of the dataset.
+"""
+
+import json
+import random
+
+
+class TrainingIndex:
+    """Training examples with per-type and per-issue buckets of example ids"""
+
+    def __init__(self, training_data):
+        self.inputs = [item['input'] for item in training_data]
+        self.responses = [item['response'] for item in training_data]
+        self.by_type = {}
+        self.by_issue = {}
+        for example_id, item in enumerate(training_data):
+            self.by_type.setdefault(item['type'], []).append(example_id)
+            if item.get('issue') is not None:
+                self.by_issue.setdefault(item['issue'], []).append(example_id)
+        self.size = len(training_data)
+
+    def random_for_type(self, conversation_type):
+        """Return a random response of the given type, or None"""
+        bucket = self.by_type.get(conversation_type)
+        if bucket:
+            return self.responses[random.choice(bucket)]
+        return None
+
+    def random_for_issue(self, issue):
+        """Return a random response for the given issue, or None"""
+        bucket = self.by_issue.get(issue)
+        if bucket:
+            return self.responses[random.choice(bucket)]
+        return None
+
+
+def load_training_index(filename="trained_chatbot_data.json"):
+    """Load the training data JSON file and bucket it"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return TrainingIndex(json.load(f)['training_data'])
@@ -0,0 +1,175 @@
+"""
+Account storage for the Sunshine portal.
+USER_STORE picks the backend: "sqlite" (default) keeps one indexed row per
+user, so a login is a primary-key lookup and a signup a single-row insert;
+"yaml" keeps the original config.yaml credentials file. Existing YAML
+accounts are imported into an empty SQLite store on first use, or with
+
+    python user_store.py import HeroPage/config/config.yaml
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import yaml
+from yaml.loader import SafeLoader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(BASE_DIR, 'HeroPage', 'config', 'users.db')
+DEFAULT_YAML_PATH = os.path.join(BASE_DIR, 'HeroPage', 'config', 'config.yaml')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+class SqliteUserStore:
+    """Users in a SQLite table keyed by username"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, username):
+        """Return {'name', 'email', 'password'} for username, or None"""
+        row = self._connect().execute(
+            "SELECT name, email, password FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'name': row[0], 'email': row[1], 'password': row[2]}
+
+    def add(self, username, name, email, password_hash):
+        """Create a user; returns False if the username is taken"""
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO users (username, name, email, password, created) VALUES (?, ?, ?, ?, ?)",
+                    (username, name, email, password_hash, time.time())
+                )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def set_password(self, username, password_hash):
+        """Replace the stored password hash of username"""
+        connection = self._connect()
+        with connection:
+            connection.execute("UPDATE users SET password = ? WHERE username = ?", (password_hash, username))
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+class YamlUserStore:
+    """Users in the credentials section of config.yaml
+
+    Writes hold a lock and replace the file atomically, so concurrent signups
+    in one process no longer lose accounts; every write still rewrites the
+    whole file.
+    """
+
+    def __init__(self, path=DEFAULT_YAML_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with open(self.path, 'r') as file:
+            return yaml.load(file, Loader=SafeLoader) or {}
+
+    def _save(self, config):
+        directory = os.path.dirname(self.path)
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, suffix='.tmp') as file:
+            yaml.dump(config, file)
+        os.replace(file.name, self.path)
+
+    def _users(self, config):
+        return config.setdefault('credentials', {}).setdefault('usernames', {}) or {}
+
+    def get(self, username):
+        user = self._users(self._load()).get(username)
+        return dict(user) if user else None
+
+    def add(self, username, name, email, password_hash):
+        with self._lock:
+            config = self._load()
+            users = self._users(config)
+            if username in users:
+                return False
+            users[username] = {'email': email, 'name': name, 'password': password_hash}
+            config['credentials']['usernames'] = users
+            self._save(config)
+        return True
+
+    def set_password(self, username, password_hash):
+        with self._lock:
+            config = self._load()
+            self._users(config)[username]['password'] = password_hash
+            self._save(config)
+
+    def count(self):
+        return len(self._users(self._load()))
+
+
+def import_yaml(store, yaml_path=DEFAULT_YAML_PATH):
+    """Copy the accounts of a config.yaml into store; returns how many were added"""
+    with open(yaml_path, 'r') as file:
+        config = yaml.load(file, Loader=SafeLoader) or {}
+    users = (config.get('credentials') or {}).get('usernames') or {}
+    added = 0
+    for username, user in users.items():
+        if store.add(str(username), user.get('name', ''), user.get('email', ''), user['password']):
+            added += 1
+    return added
+
+
+def open_user_store(backend=None, db_path=None, yaml_path=None):
+    """Open the backend named by USER_STORE, importing YAML users into a new SQLite store"""
+    backend = backend or os.getenv("USER_STORE", "sqlite")
+    yaml_path = yaml_path or DEFAULT_YAML_PATH
+    if backend == "yaml":
+        return YamlUserStore(yaml_path)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown user store: {backend}")
+    store = SqliteUserStore(db_path or os.getenv("USER_DB", DEFAULT_DB_PATH))
+    if not store.count() and os.path.exists(yaml_path):
+        import_yaml(store, yaml_path)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the portal's user store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="import the accounts of a config.yaml")
+    import_parser.add_argument("yaml", nargs="?", default=DEFAULT_YAML_PATH, help="config.yaml to import")
+    import_parser.add_argument("--db", default=os.getenv("USER_DB", DEFAULT_DB_PATH), help="SQLite user database")
+    args = parser.parse_args(argv)
+
+    store = SqliteUserStore(args.db)
+    added = import_yaml(store, args.yaml)
+    print(f"Imported {added} users into {args.db} ({store.count()} total)")
+
+
+if __name__ == "__main__":
+    main()